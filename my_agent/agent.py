@@ -1,8 +1,19 @@
 # agent.py
 from __future__ import annotations
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 from utils.state import AgentState
-from utils.nodes import load_personas, process_persona, write_feedback, check_status
+from utils.nodes import (
+    load_personas,
+    process_persona,
+    write_feedback,
+    check_status,
+    evaluate_persona,
+    load_next_page,
+    finish_job,
+    persona_tasks,
+    resolve_parallelism,
+)
 
 # --- Graph Definition ---
 
@@ -13,12 +24,43 @@ builder.add_node("load_personas", load_personas)
 builder.add_node("process_persona", process_persona)
 builder.add_node("write_feedback", write_feedback)
 builder.add_node("check_status", check_status)
+builder.add_node("evaluate_persona", evaluate_persona)
+builder.add_node("load_next_page", load_next_page)
+builder.add_node("finish_job", finish_job)
 
 # Edges
 builder.add_edge(START, "load_personas")
-builder.add_edge("load_personas", "process_persona")
 builder.add_edge("process_persona", "write_feedback")
 builder.add_edge("write_feedback", "check_status")
+builder.add_edge("evaluate_persona", "load_next_page")
+builder.add_edge("finish_job", END)
+
+
+def _dispatch_page(state: AgentState):
+    """One parallel branch per persona in the current page; finish when there are none left."""
+    tasks = persona_tasks(state)
+    if not tasks:
+        return "finish_job"
+    return [Send("evaluate_persona", task) for task in tasks]
+
+
+def _dispatch(state: AgentState):
+    """Sequential loop by default; page-by-page fan-out when max_parallel_personas > 1."""
+    if resolve_parallelism(state) <= 1:
+        return "process_persona"
+    return _dispatch_page(state)
+
+
+builder.add_conditional_edges(
+    "load_personas",
+    _dispatch,
+    ["process_persona", "evaluate_persona", "finish_job"],
+)
+builder.add_conditional_edges(
+    "load_next_page",
+    _dispatch_page,
+    ["evaluate_persona", "finish_job"],
+)
 
 
 def _should_terminate(state: AgentState) -> bool:
@@ -0,0 +1,389 @@
+# run.py
+"""
+End-to-end throughput benchmark for the my_agent graph.
+
+Runs the real graph (browser pool, capture, a11y encoding, history) against
+the local fixture site in fixture_site/, with a scripted stub in place of
+gemini_generate_json and an in-memory stand-in for Mongo, then reports
+personas/minute, step latency, peak RSS and bytes sent per step.
+
+    python my_agent/bench/run.py --personas 8 --parallel 4 --out bench_results.json
+    python my_agent/bench/run.py --baseline bench_results.json   # exit 1 on regression
+    python my_agent/bench/run.py --checkpoint records            # checkpoint every superstep with codec.RecordSerializer
+
+Extra state fields can be set with --set key=value (value parsed as JSON when possible),
+e.g. --set screenshot_format=webp --set history_max_images=1
+"""
+from __future__ import annotations
+import sys
+import json
+import math
+import time
+import uuid
+import asyncio
+import argparse
+import resource
+import threading
+from collections import defaultdict
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover
+    psutil = None
+
+# agent.py imports `utils.*` as a top-level package, same as `langgraph dev` does.
+_here = Path(__file__).resolve().parent
+_agent_dir = _here.parent
+if str(_agent_dir) not in sys.path:
+    sys.path.insert(0, str(_agent_dir))
+
+from agent import builder, graph  # noqa: E402
+from utils import nodes  # noqa: E402
+from utils import utils as mongo_utils  # noqa: E402
+from utils.browser_pool import close_browser_pool  # noqa: E402
+from utils.codec import RecordSerializer  # noqa: E402
+from utils.timing import content_bytes  # noqa: E402
+
+FIXTURE_DIR = _here / "fixture_site"
+
+# Scripted model turns; {base} is replaced with the fixture server URL.
+SCRIPT: List[Dict[str, Any]] = [
+    {"actions": [{"action": "scroll", "amount": 1200}]},
+    {"actions": [{"action": "click", "selector": "#pricing"}]},
+    {"actions": [{"action": "goto", "url": "{base}index.html"}]},
+    {"actions": [{"action": "type", "selector": "#signup-email", "text": "bench@example.com"}]},
+]
+FINAL_REPORT: Dict[str, Any] = {
+    "overall_rating": 4,
+    "summary": "Scripted benchmark report.",
+    "rubric": {
+        "value_prop_clarity": 4,
+        "information_architecture": 4,
+        "visual_design": 3,
+        "ux_flows": 4,
+        "performance": 5,
+        "accessibility": 3,
+    },
+    "highlights": ["Clear pricing table"],
+    "issues": [],
+    "critical_cta_check": {"cta_label": "Start free trial", "was_findable": True, "was_clickable": True, "blocked_by": ""},
+}
+
+
+# ============================================================
+# Stand-ins: fixture site, model, Mongo
+# ============================================================
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+def serve_fixture_site() -> Tuple[ThreadingHTTPServer, str]:
+    handler = partial(_QuietHandler, directory=str(FIXTURE_DIR))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/"
+
+
+class StubModel:
+    """
+    Drop-in for nodes.gemini_generate_json that replays SCRIPT per session.
+    Sessions are told apart by their instruction text (first user part).
+    """
+
+    def __init__(self, base_url: str, think_ms: int = 0):
+        self.base_url = base_url
+        self.think_ms = think_ms
+        self.calls: Dict[str, List[float]] = defaultdict(list)
+        self.bytes_per_step: List[int] = []
+
+    async def __call__(self, api_key: str, contents, metrics=None) -> str:
+        session = contents[0].parts[0].text or ""
+        stamps = self.calls[session]
+        stamps.append(time.perf_counter())
+        self.bytes_per_step.append(content_bytes(contents))
+        if self.think_ms:
+            await asyncio.sleep(self.think_ms / 1000)
+
+        step = len(stamps) - 1
+        if step < len(SCRIPT):
+            return json.dumps(SCRIPT[step]).replace("{base}", self.base_url)
+        return json.dumps(FINAL_REPORT)
+
+    def step_latencies_ms(self) -> List[float]:
+        """Wall time between consecutive model calls of a session (capture + model + actions)."""
+        out: List[float] = []
+        for stamps in self.calls.values():
+            out.extend((b - a) * 1000 for a, b in zip(stamps, stamps[1:]))
+        return out
+
+
+def _matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    return all(doc.get(k) == v for k, v in (query or {}).items())
+
+
+class InMemoryMongo:
+    """Dict-backed Mongo stand-in: seeded and read directly by the bench, served to the graph via AsyncInMemoryMongo."""
+
+    def __init__(self):
+        self.data: Dict[str, Dict[str, List[Dict[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+
+    def insert_one(self, db_name: Optional[str], collection: str, document: Dict[str, Any]) -> Any:
+        document.setdefault("_id", uuid.uuid4().hex)
+        self.data[db_name][collection].append(document)
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    def insert_many(self, db_name: Optional[str], collection: str, documents: List[Dict[str, Any]], ordered: bool = True) -> Any:
+        return SimpleNamespace(inserted_ids=[self.insert_one(db_name, collection, d).inserted_id for d in documents])
+
+    def find(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return [d for d in self.data[db_name][collection] if _matches(d, query)]
+
+    def find_page(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None,
+                  projection: Optional[Dict[str, Any]] = None, after_id: Any = None, limit: int = 100) -> List[Dict[str, Any]]:
+        docs = sorted(self.find(db_name, collection, query), key=lambda d: d["_id"])
+        if after_id is not None:
+            docs = [d for d in docs if d["_id"] > after_id]
+        return docs[:limit]
+
+    def find_one(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        return next(iter(self.find(db_name, collection, query)), None)
+
+
+class AsyncInMemoryMongo:
+    """utils.AsyncMongoDBClient's surface over an InMemoryMongo."""
+
+    def __init__(self, store: InMemoryMongo):
+        self.store = store
+
+    async def insert_many(self, db_name: Optional[str], collection: str, documents: List[Dict[str, Any]], ordered: bool = True) -> Any:
+        return self.store.insert_many(db_name, collection, documents, ordered)
+
+    async def find_page(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None,
+                        projection: Optional[Dict[str, Any]] = None, after_id: Any = None, limit: int = 100) -> List[Dict[str, Any]]:
+        return self.store.find_page(db_name, collection, query, projection, after_id, limit)
+
+    async def find_one(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None,
+                       projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return self.store.find_one(db_name, collection, query)
+
+    async def iter_find(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None,
+                        projection: Optional[Dict[str, Any]] = None, batch_size: int = 100):
+        for doc in self.store.find(db_name, collection, query):
+            yield doc
+
+
+class RssSampler:
+    """Peak RSS of this process plus its children (Chromium), sampled periodically."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _sample(self) -> int:
+        if psutil is None:
+            return 0
+        proc = psutil.Process()
+        total = proc.memory_info().rss
+        for child in proc.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total
+
+    async def _run(self):
+        while True:
+            self.peak_bytes = max(self.peak_bytes, self._sample())
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> float:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if not self.peak_bytes:
+            # ru_maxrss is KiB on Linux; children only counts reaped processes
+            self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            kids_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            self.peak_bytes = (self_kb + kids_kb) * 1024
+        return self.peak_bytes / (1024 * 1024)
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[idx]
+
+
+def _compile(checkpoint: str):
+    """The graph as served ("none"), or with an in-memory checkpointer using the given serde."""
+    if checkpoint == "none":
+        return graph
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    serde = RecordSerializer() if checkpoint == "records" else None
+    return builder.compile(checkpointer=InMemorySaver(serde=serde))
+
+
+async def run_benchmark(personas: int, parallel: int, think_ms: int, overrides: Dict[str, Any],
+                        checkpoint: str = "none") -> Dict[str, Any]:
+    server, base_url = serve_fixture_site()
+    mongo = InMemoryMongo()
+    for i in range(personas):
+        mongo.insert_one("bench", "personas", {
+            "name": f"Bench Persona {i}",
+            "age": 25 + i % 30,
+            "gender": "n/a",
+            "occupation": "Office manager",
+            "bio": "Orders supplies for a 40-person office and hates surprise invoices.",
+        })
+
+    stub = StubModel(base_url, think_ms)
+    nodes.gemini_generate_json = stub
+    # every get_async_mongo_client() caller on this loop now gets the stand-in
+    mongo_utils._async_mongo_instances[asyncio.get_running_loop()] = AsyncInMemoryMongo(mongo)
+
+    state: Dict[str, Any] = {
+        "job_id": f"bench-{uuid.uuid4().hex[:8]}",
+        "personas_db_name": "bench",
+        "personas_collection_name": "personas",
+        "feedback_db_name": "bench",
+        "feedback_collection_name": "feedback",
+        "mvp_link": base_url + "index.html",
+        "app_context": "Coffee subscription landing page (benchmark fixture).",
+        "gemini_api_key": "bench-key",
+        "max_parallel_personas": parallel,
+        **overrides,
+    }
+
+    sampler = RssSampler()
+    sampler.start()
+    start = time.perf_counter()
+    final: Dict[str, Any] = {}
+    try:
+        run_config = {"recursion_limit": personas * 4 + 20, "configurable": {"thread_id": state["job_id"]}}
+        final = await _compile(checkpoint).ainvoke(state, run_config)
+    finally:
+        elapsed = time.perf_counter() - start
+        peak_rss_mb = await sampler.stop()
+        await close_browser_pool()
+        server.shutdown()
+
+    feedback = mongo.find("bench", "feedback")
+    errors = sum(1 for f in feedback if nodes.feedback_failed(f.get("feedback")))
+    latencies = stub.step_latencies_ms()
+    sent = stub.bytes_per_step
+
+    return {
+        "config": {
+            "personas": personas,
+            "parallel": parallel,
+            "think_ms": think_ms,
+            "checkpoint": checkpoint,
+            "overrides": overrides,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "personas_per_minute": round(personas / elapsed * 60, 2) if elapsed else 0.0,
+        "steps": len(sent),
+        "step_latency_ms": {
+            "p50": round(_percentile(latencies, 50), 1),
+            "p95": round(_percentile(latencies, 95), 1),
+        },
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "bytes_per_step": {
+            "mean": int(sum(sent) / len(sent)) if sent else 0,
+            "p95": int(_percentile(sent, 95)),
+            "max": max(sent) if sent else 0,
+        },
+        "feedback_written": len(feedback),
+        "feedback_errors": errors,
+        "timing_rollup": final.get("timing_rollup"),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def find_regressions(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics that got worse than the baseline by more than `tolerance` (fraction)."""
+    checks = [
+        ("personas_per_minute", result["personas_per_minute"], baseline["personas_per_minute"], False),
+        ("step_latency_ms.p95", result["step_latency_ms"]["p95"], baseline["step_latency_ms"]["p95"], True),
+        ("bytes_per_step.mean", result["bytes_per_step"]["mean"], baseline["bytes_per_step"]["mean"], True),
+        ("peak_rss_mb", result["peak_rss_mb"], baseline["peak_rss_mb"], True),
+    ]
+    out: List[str] = []
+    for name, now, before, higher_is_worse in checks:
+        if not before:
+            continue
+        change = (now - before) / before
+        if (higher_is_worse and change > tolerance) or (not higher_is_worse and -change > tolerance):
+            out.append(f"{name}: {before} -> {now} ({change:+.0%})")
+    return out
+
+
+def _parse_overrides(pairs: List[str]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for pair in pairs:
+        key, _, raw = pair.partition("=")
+        try:
+            out[key] = json.loads(raw)
+        except json.JSONDecodeError:
+            out[key] = raw
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--personas", type=int, default=8)
+    parser.add_argument("--parallel", type=int, default=4, help="max_parallel_personas (1 = sequential loop)")
+    parser.add_argument("--think-ms", type=int, default=0, help="simulated model latency per call")
+    parser.add_argument("--checkpoint", choices=["none", "jsonplus", "records"], default="none",
+                        help="run with an in-memory checkpointer using the default or the record serde")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression as a fraction")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    result = asyncio.run(run_benchmark(
+        args.personas, args.parallel, args.think_ms, _parse_overrides(args.overrides), args.checkpoint,
+    ))
+
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+    print(json.dumps(result, indent=2))
+
+    if baseline:
+        regressions = find_regressions(result, baseline, args.tolerance)
+        if regressions:
+            print("Regressions vs baseline:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,17 @@
-from .utils import MongoDBClient, get_mongo_client, get_gemini_client
+from .utils import (
+    MongoDBClient,
+    AsyncMongoDBClient,
+    get_mongo_client,
+    get_async_mongo_client,
+    get_gemini_client,
+    get_async_gemini_client,
+)
 
-__all__ = ["MongoDBClient", "get_mongo_client", "get_gemini_client"]
+__all__ = [
+    "MongoDBClient",
+    "AsyncMongoDBClient",
+    "get_mongo_client",
+    "get_async_mongo_client",
+    "get_gemini_client",
+    "get_async_gemini_client",
+]
@@ -0,0 +1,100 @@
+# a11y.py
+from __future__ import annotations
+import json
+import re
+from typing import Any, Dict, Optional, Tuple
+
+INTERACTIVE_ROLES = {
+    "button", "link", "textbox", "searchbox", "checkbox", "radio", "combobox",
+    "listbox", "option", "menuitem", "menuitemcheckbox", "menuitemradio", "tab",
+    "switch", "slider", "spinbutton", "treeitem",
+}
+LANDMARK_ROLES = {
+    "banner", "navigation", "main", "contentinfo", "complementary", "search",
+    "form", "region", "dialog", "alertdialog", "heading",
+}
+_STATE_KEYS = ("value", "checked", "pressed", "selected", "expanded", "disabled", "level")
+_ID_RE = re.compile(r"^e\d+$")
+
+# (role, name, nth occurrence of that role+name) -> identifies a node across snapshots
+_NodeKey = Tuple[str, str, int]
+
+LEGEND = 'A11Y (id role "name" state...; "+" added, "-" removed, "~" changed)'
+
+
+def _line(node_id: str, node: Dict[str, Any]) -> str:
+    out = f'{node_id} {node["role"]} {json.dumps(node.get("name") or "", ensure_ascii=False)}'
+    for key in _STATE_KEYS:
+        value = node.get(key)
+        if value not in (None, False, ""):
+            out += f" {key}" if value is True else f" {key}={value}"
+    return out
+
+
+class A11yEncoder:
+    """
+    Terse, stateful encoder for page.accessibility.snapshot() trees.
+
+    Keeps only interactive and landmark nodes, one line each, with short ids
+    ("e12") that stay stable for the whole session. After the first snapshot
+    it emits only added / removed / changed lines, unless the caller asks for
+    a full listing (e.g. when the turn holding the base was pruned).
+    """
+
+    def __init__(self):
+        self._ids: Dict[_NodeKey, str] = {}
+        self._keys: Dict[str, _NodeKey] = {}
+        self._prev: Optional[Dict[str, str]] = None
+        self.last_was_full = True
+
+    def _flatten(self, tree: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        lines: Dict[str, str] = {}
+        seen: Dict[Tuple[str, str], int] = {}
+        stack = [tree] if tree else []
+        while stack:
+            node = stack.pop()
+            role = node.get("role") or ""
+            if role in INTERACTIVE_ROLES or role in LANDMARK_ROLES:
+                name = node.get("name") or ""
+                nth = seen.get((role, name), 0)
+                seen[(role, name)] = nth + 1
+                key = (role, name, nth)
+                node_id = self._ids.get(key)
+                if node_id is None:
+                    node_id = f"e{len(self._ids) + 1}"
+                    self._ids[key] = node_id
+                    self._keys[node_id] = key
+                lines[node_id] = _line(node_id, node)
+            stack.extend(reversed(node.get("children") or []))
+        return lines
+
+    def encode(self, tree: Optional[Dict[str, Any]], allow_diff: bool = True) -> str:
+        lines = self._flatten(tree)
+        prev = self._prev
+        self._prev = lines
+
+        if prev is not None and allow_diff:
+            diff = [f"+ {line}" for nid, line in lines.items() if nid not in prev]
+            diff += [f"- {nid}" for nid in prev if nid not in lines]
+            diff += [f"~ {line}" for nid, line in lines.items() if nid in prev and prev[nid] != line]
+            full_len = sum(len(line) + 1 for line in lines.values())
+            if sum(len(line) + 1 for line in diff) < full_len:
+                self.last_was_full = False
+                return f"{LEGEND} diff vs previous:\n" + ("\n".join(diff) if diff else "(no changes)")
+
+        self.last_was_full = True
+        return f"{LEGEND}\n" + "\n".join(lines.values())
+
+    def selector(self, ref: str) -> Optional[str]:
+        """Playwright selector for an encoder id like "e12", or None if `ref` isn't one."""
+        if not _ID_RE.match(ref or ""):
+            return None
+        key = self._keys.get(ref)
+        if key is None:
+            return None
+        role, name, nth = key
+        # nth counts nodes with this exact role+name, so the selector must filter the
+        # same way: "..."s is an exact, case-sensitive match (the default substring
+        # match would let "Sign in" resolve to "Sign in with Google"), and ""s keeps
+        # unnamed nodes from being counted among the named ones of their role
+        return f"role={role}[name={json.dumps(name, ensure_ascii=False)}s] >> nth={nth}"
@@ -0,0 +1,162 @@
+# asset_cache.py
+from __future__ import annotations
+import os
+import json
+import asyncio
+import hashlib
+import shutil
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from playwright.async_api import Error as PlaywrightError
+
+CACHEABLE_TYPES = {"script", "stylesheet", "image", "font"}
+MAX_ENTRY_BYTES = 5 * 1024 * 1024
+# Bodies are handed to the page decoded, so transport headers from the origin no longer apply.
+_TRANSPORT_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+_DROP_HEADERS = _TRANSPORT_HEADERS | {"set-cookie"}
+
+
+@dataclass
+class CachedAsset:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+def _cacheable(status: int, headers: Dict[str, str], size: int) -> bool:
+    if status != 200 or size > MAX_ENTRY_BYTES or "set-cookie" in headers:
+        return False
+    cache_control = headers.get("cache-control", "").lower()
+    return "no-store" not in cache_control and "private" not in cache_control
+
+
+class AssetCache:
+    """
+    Job-scoped cache of static responses (scripts, styles, images, fonts).
+
+    The first persona fetches an asset from the MVP; later personas in the job
+    get it from memory (LRU, capped at max_bytes) or, when disk_dir is set,
+    from disk. Installed as a context.route handler, or chained behind a
+    RequestRouter via its passthrough.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.size = 0
+        self._entries: "OrderedDict[str, CachedAsset]" = OrderedDict()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # --- storage ---
+
+    def _disk_path(self, url: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha1(url.encode("utf-8")).hexdigest())
+
+    def _read_disk(self, url: str) -> Optional[CachedAsset]:
+        path = self._disk_path(url)
+        try:
+            with open(path + ".json", "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            with open(path, "rb") as fh:
+                return CachedAsset(meta["status"], meta["headers"], fh.read())
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, url: str, asset: CachedAsset) -> None:
+        path = self._disk_path(url)
+        try:
+            with open(path, "wb") as fh:
+                fh.write(asset.body)
+            with open(path + ".json", "w", encoding="utf-8") as fh:
+                json.dump({"url": url, "status": asset.status, "headers": asset.headers}, fh)
+        except OSError:
+            pass
+
+    def _remember(self, url: str, asset: CachedAsset) -> None:
+        old = self._entries.pop(url, None)
+        if old is not None:
+            self.size -= len(old.body)
+        self._entries[url] = asset
+        self.size += len(asset.body)
+        while self.size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.body)
+
+    async def get(self, url: str) -> Optional[CachedAsset]:
+        asset = self._entries.get(url)
+        if asset is not None:
+            self._entries.move_to_end(url)
+            return asset
+        if self.disk_dir:
+            asset = await asyncio.to_thread(self._read_disk, url)
+            if asset is not None:
+                self._remember(url, asset)
+        return asset
+
+    async def put(self, url: str, asset: CachedAsset) -> None:
+        self._remember(url, asset)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, url, asset)
+
+    # --- routing ---
+
+    def handler(self, counts: Dict[str, int]) -> Callable[[Any, Any], Any]:
+        """A route handler that tallies "asset_cache.hit" / "asset_cache.miss" into `counts`."""
+
+        def _count(key: str) -> None:
+            counts[key] = counts.get(key, 0) + 1
+
+        async def handle(route, request) -> None:
+            try:
+                if request.method != "GET" or request.resource_type not in CACHEABLE_TYPES:
+                    await route.continue_()
+                    return
+                url = request.url
+                asset = await self.get(url)
+                if asset is not None:
+                    _count("asset_cache.hit")
+                    await route.fulfill(status=asset.status, headers=asset.headers, body=asset.body)
+                    return
+
+                _count("asset_cache.miss")
+                response = await route.fetch()
+                body = await response.body()
+                headers = {k.lower(): v for k, v in response.headers.items()}
+                if _cacheable(response.status, headers, len(body)):
+                    kept = {k: v for k, v in headers.items() if k not in _DROP_HEADERS}
+                    await self.put(url, CachedAsset(response.status, kept, body))
+                # body is already decoded: the origin's content-encoding / length would corrupt it
+                live = {k: v for k, v in headers.items() if k not in _TRANSPORT_HEADERS}
+                await route.fulfill(status=response.status, headers=live, body=body)
+            except PlaywrightError:
+                # continue/fetch failed (page or context closed, refused, DNS, timeout):
+                # resolve the route anyway, or the request hangs until the context
+                # closes and load/settle never finish
+                try:
+                    await route.abort()
+                except PlaywrightError:
+                    pass
+
+        return handle
+
+
+# One cache per job, dropped (with its on-disk copy) when the job finishes.
+ASSET_CACHE_MAX_MB = int(os.getenv("ASSET_CACHE_MAX_MB", "128"))
+_job_caches: Dict[str, AssetCache] = {}
+
+
+def get_asset_cache(job_id: str, max_mb: int = ASSET_CACHE_MAX_MB, disk_dir: Optional[str] = None) -> AssetCache:
+    cache = _job_caches.get(job_id)
+    if cache is None:
+        cache = AssetCache(max_mb * 1024 * 1024, os.path.join(disk_dir, job_id) if disk_dir else None)
+        _job_caches[job_id] = cache
+    return cache
+
+
+async def drop_asset_cache(job_id: str) -> None:
+    cache = _job_caches.pop(job_id, None)
+    if cache is not None and cache.disk_dir:
+        await asyncio.to_thread(shutil.rmtree, cache.disk_dir, ignore_errors=True)
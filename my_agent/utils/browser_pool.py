@@ -0,0 +1,197 @@
+# browser_pool.py
+from __future__ import annotations
+import os
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+try:  # memory ceiling is best-effort; without psutil only the session cap applies
+    import psutil
+except ImportError:  # pragma: no cover
+    psutil = None
+
+# ============================================================
+# Pool Config
+# ============================================================
+HEADLESS = True
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+]
+
+POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))                          # warm Chromium processes
+MAX_SESSIONS_PER_BROWSER = int(os.getenv("BROWSER_MAX_SESSIONS", "25"))       # recycle after N contexts
+MAX_BROWSER_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "0"))                # 0 disables the memory ceiling
+
+
+@dataclass
+class _PooledBrowser:
+    browser: Browser
+    sessions: int = 0       # contexts handed out over the browser's lifetime
+    active: int = 0         # contexts currently open
+    retiring: bool = False  # no new contexts; closed once active hits 0
+
+
+def _chromium_rss_mb() -> float:
+    """Total RSS of the Chromium processes spawned under this Python process."""
+    if psutil is None:
+        return 0.0
+    total = 0
+    try:
+        for child in psutil.Process().children(recursive=True):
+            try:
+                if "chrom" in child.name().lower():
+                    total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    except psutil.Error:
+        return 0.0
+    return total / (1024 * 1024)
+
+
+class BrowserPool:
+    """
+    Process-wide pool of warm Chromium instances.
+
+    Sessions get their own BrowserContext (cheap, isolated cookies/cache) on the
+    least-loaded browser. A browser is retired after max_sessions contexts, or
+    when Chromium's combined RSS exceeds max_rss_mb, and relaunched on demand.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_sessions: int = MAX_SESSIONS_PER_BROWSER,
+        max_rss_mb: int = MAX_BROWSER_RSS_MB,
+        headless: bool = HEADLESS,
+        args: Optional[List[str]] = None,
+    ):
+        self.size = max(1, size)
+        self.max_sessions = max_sessions
+        self.max_rss_mb = max_rss_mb
+        self.headless = headless
+        self.args = list(args or CHROMIUM_ARGS)
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[_PooledBrowser] = []
+        self._lock = asyncio.Lock()
+
+    async def _ensure_playwright(self) -> Playwright:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return self._playwright
+
+    async def _close_browser(self, entry: _PooledBrowser) -> None:
+        if entry in self._browsers:
+            self._browsers.remove(entry)
+        try:
+            await entry.browser.close()
+        except Exception:
+            pass
+
+    async def _checkout(self) -> _PooledBrowser:
+        async with self._lock:
+            for entry in list(self._browsers):
+                if not entry.browser.is_connected():
+                    self._browsers.remove(entry)
+
+            live = [b for b in self._browsers if not b.retiring]
+            if len(live) < self.size:
+                pw = await self._ensure_playwright()
+                browser = await pw.chromium.launch(headless=self.headless, args=self.args)
+                entry = _PooledBrowser(browser=browser)
+                self._browsers.append(entry)
+            else:
+                entry = min(live, key=lambda b: b.active)
+
+            entry.sessions += 1
+            entry.active += 1
+            if self.max_sessions and entry.sessions >= self.max_sessions:
+                entry.retiring = True
+            return entry
+
+    async def _checkin(self, entry: _PooledBrowser) -> None:
+        # psutil walks the process tree synchronously: keep it off the loop and out of the lock
+        over_rss = bool(self.max_rss_mb) and await asyncio.to_thread(_chromium_rss_mb) > self.max_rss_mb
+        async with self._lock:
+            entry.active -= 1
+            if over_rss:
+                entry.retiring = True
+            if entry.retiring and entry.active <= 0:
+                await self._close_browser(entry)
+
+    @asynccontextmanager
+    async def context(self, **context_kwargs: Any) -> AsyncIterator[BrowserContext]:
+        """
+        Yields a fresh BrowserContext on a pooled browser and closes it afterwards.
+        """
+        entry = await self._checkout()
+        ctx: Optional[BrowserContext] = None
+        try:
+            ctx = await entry.browser.new_context(**context_kwargs)
+            yield ctx
+        finally:
+            if ctx is not None:
+                try:
+                    await ctx.close()
+                except Exception:
+                    pass
+            await self._checkin(entry)
+
+    async def close(self) -> None:
+        async with self._lock:
+            for entry in list(self._browsers):
+                await self._close_browser(entry)
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
+
+
+# Global singleton (lazy). Playwright objects belong to the loop that created
+# them, so a new event loop gets a new pool and the old one is closed on its
+# own loop. Servers close it in their lifespan (see webapp.py).
+_pool_instance: Optional[BrowserPool] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _close_stale(pool: BrowserPool, loop: asyncio.AbstractEventLoop) -> None:
+    """Closes a pool left behind by another event loop, as far as that loop still allows."""
+    if loop.is_closed():
+        # nothing can run on it any more; callers that cycle loops (asyncio.run per
+        # job, bench/run.py) must await close_browser_pool() before the loop ends
+        return
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(pool.close(), loop)
+    else:
+        threading.Thread(target=loop.run_until_complete, args=(pool.close(),), daemon=True).start()
+
+
+def get_browser_pool() -> BrowserPool:
+    global _pool_instance, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool_instance is None or _pool_loop is not loop:
+        if _pool_instance is not None:
+            _close_stale(_pool_instance, _pool_loop)
+        _pool_instance = BrowserPool()
+        _pool_loop = loop
+    return _pool_instance
+
+
+async def close_browser_pool() -> None:
+    global _pool_instance, _pool_loop
+    pool, pool_loop = _pool_instance, _pool_loop
+    _pool_instance = None
+    _pool_loop = None
+    if pool is None:
+        return
+    if pool_loop is asyncio.get_running_loop():
+        await pool.close()
+    else:
+        _close_stale(pool, pool_loop)
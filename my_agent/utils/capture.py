@@ -0,0 +1,120 @@
+# capture.py
+from __future__ import annotations
+import base64
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from playwright.async_api import Error as PlaywrightError
+
+from .config import EvalConfig
+
+_MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+
+
+@dataclass
+class Screenshot:
+    data: bytes         # encoded image, ready for Part.from_bytes
+    mime_type: str
+
+
+class ScreenshotCapturer:
+    """
+    Captures compact screenshots through Chromium's DevTools protocol.
+
+    Page.captureScreenshot encodes JPEG/WebP and downscales (clip.scale) inside
+    the browser, so large pages never travel as full-size PNGs. One CDP session
+    is opened per page and reused for every step.
+    """
+
+    def __init__(self, page, cfg: EvalConfig):
+        self.page = page
+        self.cfg = cfg
+        self.format = cfg.screenshot_format if cfg.screenshot_format in _MIME_TYPES else "jpeg"
+        self._cdp = None
+
+    async def _session(self):
+        if self._cdp is None:
+            self._cdp = await self.page.context.new_cdp_session(self.page)
+        return self._cdp
+
+    def _clips(self, metrics: Dict[str, Any]) -> List[Dict[str, float]]:
+        viewport = metrics["cssLayoutViewport"]
+        content = metrics["cssContentSize"]
+        width = viewport["clientWidth"]
+        height = viewport["clientHeight"]
+        max_tiles = max(1, int(self.cfg.screenshot_max_tiles))
+
+        if self.cfg.screenshot_mode == "viewport":
+            return [{"x": viewport["pageX"], "y": viewport["pageY"], "width": width, "height": height}]
+
+        page_height = min(content["height"], height * max_tiles)
+        if self.cfg.screenshot_mode == "full":
+            return [{"x": 0, "y": 0, "width": width, "height": page_height}]
+
+        # "tiled": viewport-sized slices from the top of the page
+        tiles = max(1, math.ceil(page_height / height))
+        return [
+            {"x": 0, "y": i * height, "width": width, "height": min(height, page_height - i * height)}
+            for i in range(tiles)
+        ]
+
+    def _scale(self, width: float) -> float:
+        max_width = self.cfg.screenshot_max_width
+        if not max_width or width <= max_width:
+            return 1.0
+        return max_width / width
+
+    async def capture(self) -> List[Screenshot]:
+        try:
+            cdp = await self._session()
+            metrics = await cdp.send("Page.getLayoutMetrics")
+            shots: List[Screenshot] = []
+            for clip in self._clips(metrics):
+                params: Dict[str, Any] = {
+                    "format": self.format,
+                    "clip": {**clip, "scale": self._scale(clip["width"])},
+                    "captureBeyondViewport": self.cfg.screenshot_mode != "viewport",
+                    "optimizeForSpeed": True,
+                }
+                if self.format != "png":
+                    params["quality"] = int(self.cfg.screenshot_quality)
+                res = await cdp.send("Page.captureScreenshot", params)
+                # CDP transports images as base64; decode once into raw bytes.
+                shots.append(Screenshot(base64.b64decode(res["data"]), _MIME_TYPES[self.format]))
+            return shots
+        except PlaywrightError:
+            return [await self._fallback()]
+
+    async def thumbnail(self, width: int = 64) -> bytes:
+        """Tiny PNG of the viewport, used only for perceptual hashing (page_hash.py)."""
+        try:
+            cdp = await self._session()
+            viewport = (await cdp.send("Page.getLayoutMetrics"))["cssLayoutViewport"]
+            clip = {
+                "x": viewport["pageX"],
+                "y": viewport["pageY"],
+                "width": viewport["clientWidth"],
+                "height": viewport["clientHeight"],
+                "scale": min(1.0, width / max(1, viewport["clientWidth"])),
+            }
+            res = await cdp.send("Page.captureScreenshot", {"format": "png", "clip": clip, "optimizeForSpeed": True})
+            return base64.b64decode(res["data"])
+        except PlaywrightError:
+            return await self.page.screenshot(type="png", scale="css")
+
+    async def _fallback(self) -> Screenshot:
+        """Plain Playwright viewport capture when CDP is unavailable."""
+        fmt = "png" if self.format == "png" else "jpeg"
+        kwargs: Dict[str, Any] = {"full_page": False, "type": fmt, "scale": "css"}
+        if fmt == "jpeg":
+            kwargs["quality"] = int(self.cfg.screenshot_quality)
+        return Screenshot(await self.page.screenshot(**kwargs), _MIME_TYPES[fmt])
+
+    async def close(self) -> None:
+        if self._cdp is not None:
+            try:
+                await self._cdp.detach()
+            except PlaywrightError:
+                pass
+            self._cdp = None
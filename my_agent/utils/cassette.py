@@ -0,0 +1,115 @@
+# cassette.py
+from __future__ import annotations
+import os
+import json
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from .page_hash import PageFingerprint
+
+CASSETTE_MODES = ("off", "record", "replay", "auto")
+
+
+class CassetteMiss(LookupError):
+    """Replay mode found no recorded response for the current page state."""
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    Deterministic record/replay of one computer-use session.
+
+    Every step is keyed by its content: the previous step's key, the
+    instruction, the screenshot hash and the a11y hash. Identical page states
+    reached through the same history therefore map to the same model response.
+    Stored as compact JSON lines, one per step:
+      {"key", "step", "screenshot_hash", "a11y_hash", "response", "actions"}
+
+    Modes:
+      - "record": always call the model, (re)write the cassette
+      - "replay": serve responses from the cassette only; a miss raises CassetteMiss
+      - "auto":   serve hits, call the model on misses and append them
+    """
+
+    def __init__(self, path: str, mode: str, instruction: str):
+        if mode not in CASSETTE_MODES or mode == "off":
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._instruction = _sha(instruction)
+        self._prev_key = ""
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._new: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def path_for(directory: str, url: str, instruction: str) -> str:
+        return os.path.join(directory, _sha(f"{url}\n{instruction}")[:24] + ".jsonl")
+
+    @classmethod
+    async def open(cls, directory: str, mode: str, url: str, instruction: str) -> "Cassette":
+        cassette = cls(cls.path_for(directory, url, instruction), mode, instruction)
+        if mode != "record":
+            cassette._records = await asyncio.to_thread(cassette._load)
+        return cassette
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        records: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    rec = json.loads(line)
+                    records[rec["key"]] = rec
+        return records
+
+    def next_key(self, fingerprint: PageFingerprint) -> str:
+        screenshot = f"{fingerprint.phash:016x}" if fingerprint.phash is not None else fingerprint.image_sha1
+        key = _sha(f"{self._prev_key}|{self._instruction}|{screenshot}|{fingerprint.a11y}")[:32]
+        self._prev_key = key
+        return key
+
+    def lookup(self, key: str) -> Optional[str]:
+        if self.mode == "record":
+            return None
+        rec = self._records.get(key)
+        if rec is not None:
+            return rec["response"]
+        if self.mode == "replay":
+            raise CassetteMiss(f"No recorded response for step key {key} in {self.path}")
+        return None
+
+    def record(self, key: str, step: int, fingerprint: PageFingerprint, response: str) -> None:
+        try:
+            actions = json.loads(response).get("actions")
+        except (json.JSONDecodeError, AttributeError):
+            actions = None
+        rec = {
+            "key": key,
+            "step": step,
+            "screenshot_hash": fingerprint.phash if fingerprint.phash is not None else fingerprint.image_sha1,
+            "a11y_hash": fingerprint.a11y,
+            "response": response,
+            "actions": actions,
+        }
+        self._records[key] = rec
+        self._new.append(rec)
+
+    async def save(self) -> None:
+        if not self._new:
+            return
+        new, self._new = self._new, []
+        mode = "w" if self.mode == "record" else "a"
+
+        def _write():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, mode, encoding="utf-8") as fh:
+                for rec in new:
+                    fh.write(json.dumps(rec, separators=(",", ":")) + "\n")
+
+        await asyncio.to_thread(_write)
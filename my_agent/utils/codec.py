@@ -0,0 +1,81 @@
+# codec.py
+from __future__ import annotations
+from typing import Any, Dict, Tuple, Type
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from .schema import Feedback, Persona
+
+try:
+    import ormsgpack
+except ImportError:  # pragma: no cover - ships with langgraph-checkpoint
+    ormsgpack = None
+
+# msgpack ext codes for records; payload is the record's row (field values in order).
+RECORD_TYPES: Dict[int, Type[Any]] = {
+    64: Persona,
+    65: Feedback,
+}
+_RECORD_CODES = {cls: code for code, cls in RECORD_TYPES.items()}
+
+# Everything that is not a plain msgpack type or a record goes through `default`,
+# which refuses it, so the serializer below can hand the value to JsonPlus intact
+# (tuples stay tuples, datetimes stay datetimes, Send stays Send).
+_PASSTHROUGH = ("BIG_INT", "DATACLASS", "DATETIME", "ENUM", "SUBCLASS", "TUPLE", "UUID")
+_PACK_OPTIONS = 0
+if ormsgpack is not None:
+    for _name in _PASSTHROUGH:
+        # older ormsgpack releases lack some of these flags
+        _PACK_OPTIONS |= getattr(ormsgpack, f"OPT_PASSTHROUGH_{_name}", 0)
+
+
+def _default(obj: Any) -> Any:
+    code = _RECORD_CODES.get(type(obj))
+    if code is None:
+        raise TypeError(f"not a record: {type(obj).__name__}")
+    return ormsgpack.Ext(code, ormsgpack.packb(list(obj.to_row()), default=_default, option=_PACK_OPTIONS))
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    cls = RECORD_TYPES.get(code)
+    if cls is None:
+        raise ValueError(f"unknown record ext code {code}")
+    return cls.from_row(ormsgpack.unpackb(data, ext_hook=_ext_hook))
+
+
+def pack(obj: Any) -> bytes:
+    """msgpack with Persona / Feedback as compact rows. Raises TypeError on anything else non-native."""
+    if ormsgpack is None:
+        raise TypeError("ormsgpack is not installed")
+    return ormsgpack.packb(obj, default=_default, option=_PACK_OPTIONS)
+
+
+def unpack(data: bytes) -> Any:
+    return ormsgpack.unpackb(data, ext_hook=_ext_hook)
+
+
+class RecordSerializer:
+    """
+    Checkpoint serde (LangGraph SerializerProtocol) for graph state holding
+    Persona / Feedback records: such values are packed as msgpack rows; any
+    value it cannot represent exactly is delegated to JsonPlusSerializer.
+
+        InMemorySaver(serde=RecordSerializer())
+    """
+
+    TYPE = "records"
+
+    def __init__(self, fallback: Any = None):
+        self.fallback = fallback or JsonPlusSerializer()
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        try:
+            return self.TYPE, pack(obj)
+        except TypeError:
+            return self.fallback.dumps_typed(obj)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_ == self.TYPE:
+            return unpack(payload)
+        return self.fallback.loads_typed(data)
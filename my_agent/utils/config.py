@@ -0,0 +1,54 @@
+# config.py
+from __future__ import annotations
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class EvalConfig:
+    """
+    Per-job tuning for the computer-use loop.
+    Every field can be overridden by a state key of the same name.
+    """
+
+    # Screenshots (see capture.py)
+    screenshot_mode: str = "viewport"       # "viewport" | "tiled" | "full"
+    screenshot_format: str = "jpeg"         # "jpeg" | "webp" | "png"
+    screenshot_quality: int = 70            # 0-100, ignored for png
+    screenshot_max_width: int = 1024        # downscale wider captures; 0 keeps CSS pixels
+    screenshot_max_tiles: int = 4           # cap for "tiled" / "full" on long pages
+
+    # Unchanged-page detection (see page_hash.py)
+    unchanged_phash_distance: int = 4       # max differing dHash bits still counted as "same screenshot"
+    max_unchanged_steps: int = 3            # identical states in a row before forcing the final report; 0 disables
+
+    # Conversation history (see history.py)
+    history_max_images: int = 2             # screenshots resent verbatim; older turns are summarised
+    history_token_budget: int = 60000       # estimated tokens per request; 0 disables the cap
+
+    # Page settling after actions (see settle.py)
+    navigation_wait_until: str = "domcontentloaded"  # goto() returns here; settling covers the rest
+    settle_quiet_ms: int = 250              # no requests and no DOM mutations for this long
+    settle_timeout_ms: int = 3000           # hard cap per settle
+
+    # Request routing (see routing.py)
+    routing_profile: str = "default"        # "off" | "default" | "strict"
+    routing_block_patterns: List[str] = field(default_factory=list)  # extra host suffixes / URL globs to block
+
+    # Shared static-asset cache across the job's personas (see asset_cache.py)
+    asset_cache: bool = True
+    asset_cache_max_mb: int = 128           # in-memory LRU cap per job
+    asset_cache_dir: Optional[str] = None   # also persist assets under <dir>/<job_id> (removed at job end)
+
+    # Record / replay of model responses (see cassette.py)
+    cassette_mode: str = "off"              # "off" | "record" | "replay" | "auto"
+    cassette_dir: str = ".cassettes"        # one JSONL cassette per (url, instruction)
+
+    @staticmethod
+    def from_state(state: Dict[str, Any]) -> "EvalConfig":
+        cfg = EvalConfig()
+        for f in fields(cfg):
+            value = state.get(f.name)
+            if value is not None:
+                setattr(cfg, f.name, value)
+        return cfg
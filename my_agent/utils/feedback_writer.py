@@ -0,0 +1,84 @@
+# feedback_writer.py
+from __future__ import annotations
+import os
+import asyncio
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+from .utils import get_async_mongo_client
+
+FEEDBACK_FLUSH_SIZE = int(os.getenv("FEEDBACK_FLUSH_SIZE", "25"))
+FEEDBACK_FLUSH_INTERVAL_S = float(os.getenv("FEEDBACK_FLUSH_INTERVAL_S", "5"))
+
+_DUPLICATE_KEY = 11000
+
+
+class FeedbackWriter:
+    """
+    Buffers feedback documents for one (db, collection) and writes them with
+    unordered insert_many once `max_batch` are queued or `max_delay_s` has
+    passed since the first one, whichever comes first. flush() forces a write.
+
+    Documents carry pre-assigned _ids, so a retried batch may hit duplicate-key
+    errors for the ones that already landed; those are ignored. Any other
+    failure puts the affected documents back so the next flush retries them.
+    """
+
+    def __init__(self, db_name: str, collection: str, max_batch: int = FEEDBACK_FLUSH_SIZE,
+                 max_delay_s: float = FEEDBACK_FLUSH_INTERVAL_S):
+        self.db_name = db_name
+        self.collection = collection
+        self.max_batch = max(1, max_batch)
+        self.max_delay_s = max_delay_s
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    async def add(self, doc: Dict[str, Any]) -> None:
+        self._buffer.append(doc)
+        if len(self._buffer) >= self.max_batch:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.max_delay_s)
+        try:
+            await self.flush()
+        except Exception:
+            # kept in the buffer; the next add() or the job's final flush retries
+            pass
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._buffer:
+                return
+            docs, self._buffer = self._buffer, []
+            try:
+                await get_async_mongo_client().insert_many(self.db_name, self.collection, docs, ordered=False)
+            except BulkWriteError as exc:
+                errors = exc.details.get("writeErrors", [])
+                if any(e.get("code") != _DUPLICATE_KEY for e in errors):
+                    failed = {e["index"] for e in errors if e.get("code") != _DUPLICATE_KEY}
+                    self._buffer[:0] = [d for i, d in enumerate(docs) if i in failed]
+                    raise
+            except Exception:
+                self._buffer[:0] = docs
+                raise
+
+
+# Writers hold asyncio primitives, so they are kept per event loop.
+_writers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], FeedbackWriter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_feedback_writer(db_name: str, collection: str) -> FeedbackWriter:
+    writers = _writers.setdefault(asyncio.get_running_loop(), {})
+    writer = writers.get((db_name, collection))
+    if writer is None:
+        writer = FeedbackWriter(db_name, collection)
+        writers[(db_name, collection)] = writer
+    return writer
@@ -0,0 +1,109 @@
+# history.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from google.genai.types import Content, Part
+
+# Rough request-size accounting; close enough to keep requests under a budget.
+IMAGE_TOKENS = 258          # Gemini bills a <=768px image tile at ~258 tokens
+CHARS_PER_TOKEN = 4
+
+_DIGEST_ROLES = {
+    "button", "link", "textbox", "searchbox", "checkbox", "radio", "combobox",
+    "menuitem", "tab", "switch", "heading",
+}
+
+
+def a11y_digest(tree: Optional[Dict[str, Any]], limit: int = 15) -> str:
+    """A one-line `role "name"` list of the first interactive nodes, for pruned turns."""
+    found: List[str] = []
+    stack = [tree] if tree else []
+    while stack and len(found) < limit:
+        node = stack.pop(0)
+        if node.get("role") in _DIGEST_ROLES and node.get("name"):
+            found.append(f'{node["role"]} "{node["name"][:40]}"')
+        stack.extend(node.get("children") or [])
+    return "; ".join(found)
+
+
+@dataclass
+class HistoryTurn:
+    """One user turn: the full parts plus what to send once its images are pruned."""
+    lead_text: str          # prompt text, always kept
+    parts: List[Part]       # verbatim parts (prompt, images, a11y)
+    images: int             # image parts in `parts`
+    text_chars: int         # characters of text in `parts`
+    summary: str            # replaces images + a11y when pruned
+    a11y_full: bool = False # carries the full a11y listing later diffs build on
+    reply: str = ""
+
+    def tokens(self, verbatim: bool) -> int:
+        if verbatim:
+            return self.images * IMAGE_TOKENS + self.text_chars // CHARS_PER_TOKEN + len(self.reply) // CHARS_PER_TOKEN
+        return (len(self.lead_text) + len(self.summary) + len(self.reply)) // CHARS_PER_TOKEN
+
+    def user_content(self, verbatim: bool) -> Content:
+        if verbatim or not self.images:
+            return Content(role="user", parts=self.parts)
+        return Content(role="user", parts=[Part.from_text(text=self.lead_text), Part.from_text(text=self.summary)])
+
+
+class ConversationHistory:
+    """
+    Bounded computer-use conversation.
+
+    Only the newest `max_images` screenshots are resent verbatim; older turns
+    collapse to their text summary. If the estimate still exceeds
+    `token_budget`, the oldest turns after the first (which carries the
+    instruction) are dropped, so per-request size stays flat over 20 steps.
+    Turns from the latest full a11y listing onward are never dropped: each
+    a11y diff is relative to the one before it, back to that listing. The
+    caller keeps that chain within the verbatim image window, so it stays short.
+    """
+
+    def __init__(self, max_images: int = 2, token_budget: int = 0):
+        self.max_images = max_images
+        self.token_budget = token_budget
+        self.turns: List[HistoryTurn] = []
+
+    def append(self, turn: HistoryTurn, reply: str) -> None:
+        turn.reply = reply
+        self.turns.append(turn)
+
+    def _a11y_base(self, current: HistoryTurn) -> int:
+        """Index of the oldest turn the a11y diffs depend on; len(turns) if none do."""
+        if current.a11y_full:
+            return len(self.turns)
+        for i in range(len(self.turns) - 1, -1, -1):
+            if self.turns[i].a11y_full:
+                return i
+        return len(self.turns)
+
+    def build(self, current: HistoryTurn) -> List[Content]:
+        """Contents for the next request: pruned history + the current turn verbatim."""
+        images_left = max(0, self.max_images - current.images)
+        verbatim: List[bool] = [False] * len(self.turns)
+        for i in range(len(self.turns) - 1, -1, -1):
+            turn = self.turns[i]
+            if turn.images <= images_left:
+                verbatim[i] = True
+                images_left -= turn.images
+            elif turn.images:
+                images_left = 0
+
+        keep = list(range(len(self.turns)))
+        if self.token_budget:
+            pinned = self._a11y_base(current)
+            total = current.tokens(True) + sum(self.turns[i].tokens(verbatim[i]) for i in keep)
+            while total > self.token_budget and len(keep) > 1 and keep[1] < pinned:
+                dropped = keep.pop(1)
+                total -= self.turns[dropped].tokens(verbatim[dropped])
+
+        contents: List[Content] = []
+        for i in keep:
+            turn = self.turns[i]
+            contents.append(turn.user_content(verbatim[i]))
+            contents.append(Content(role="model", parts=[Part.from_text(text=turn.reply)]))
+        contents.append(current.user_content(True))
+        return contents
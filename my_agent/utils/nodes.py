@@ -25,49 +25,61 @@ if sys.platform.startswith("win"):
 
 import os
 import json
-import base64
 import asyncio
 import traceback
+from contextlib import nullcontext
 from typing import Any, Dict, List, Optional
 
 # --- Playwright: use ASYNC API only (Option A) ---
-from playwright.async_api import async_playwright, Error as PlaywrightError
+from playwright.async_api import Error as PlaywrightError
 
-# --- Gemini (sync client; we'll call via to_thread) ---
-from google import genai
+# --- Gemini (native async client, cached per API key) ---
 from google.genai.types import Content, Part
 
+from bson import ObjectId
+
 # --- Your project utils/schemas ---
 # Note: Ensure these paths are correct relative to your execution context
-from .utils import get_mongo_client
+from .utils import get_async_mongo_client, get_async_gemini_client, gemini_semaphore
 from .schema import Feedback, Persona
+from .browser_pool import get_browser_pool
+from .storage_state import get_storage_state_store, storage_state_key
+from .config import EvalConfig
+from .capture import ScreenshotCapturer
+from .page_hash import PageFingerprint, a11y_hash, image_hash
+from .history import ConversationHistory, HistoryTurn, a11y_digest
+from .a11y import A11yEncoder
+from .cassette import Cassette, CassetteMiss
+from .timing import SessionMetrics, content_bytes, rollup
+from .settle import PageSettler
+from .routing import RequestRouter, RoutingProfile
+from .asset_cache import AssetCache, get_asset_cache, drop_asset_cache
+from .feedback_writer import get_feedback_writer
 
 # ============================================================
 # Model / Runtime Config
 # ============================================================
 MODEL_NAME = "gemini-2.5-computer-use-preview-10-2025"
 MAX_STEPS = 20
-HEADLESS = True
 
 VIEWPORT = {"width": 1440, "height": 900}
-BROWSER_STATE_PATH = "playwright_state.json"  # persistent cookies/session
-PAGE_DEFAULT_TIMEOUT_MS = 15000
-NAVIGATION_WAIT_UNTIL = "load"
 
-CHROMIUM_ARGS = [
-    "--no-sandbox",
-    "--disable-dev-shm-usage",
-    "--disable-gpu",
-]
+UNCHANGED_PROMPT = (
+    "No visual change since your last actions (same screenshot and accessibility tree). "
+    "Try a different action or return your final report."
+)
+STUCK_PROMPT = (
+    "The page has not changed for {n} consecutive steps. "
+    "Stop exploring and respond with the FINAL JSON report now."
+)
+PAGE_DEFAULT_TIMEOUT_MS = 15000
+NAVIGATION_WAIT_UNTIL = "load"  # default when no settler is used; see EvalConfig.navigation_wait_until
+# Browser launch settings (headless, Chromium args, recycling) live in browser_pool.py
 
 # ============================================================
 # Helpers: screenshots, a11y, actions
 # ============================================================
 
-async def _grab_screenshot_b64(page) -> str:
-    png_bytes = await page.screenshot(full_page=True, type="png")
-    return base64.b64encode(png_bytes).decode("utf-8")
-
 async def _grab_a11y_snapshot(page) -> dict:
     try:
         snap = await page.accessibility.snapshot()
@@ -75,63 +87,91 @@ async def _grab_a11y_snapshot(page) -> dict:
     except PlaywrightError:
         return {}
 
-async def _apply_action(page, action: dict):
+def _span(metrics: Optional[SessionMetrics], phase: str):
+    return metrics.span(phase) if metrics else nullcontext()
+
+async def _apply_action(
+    page,
+    action: dict,
+    encoder: Optional[A11yEncoder] = None,
+    settler: Optional[PageSettler] = None,
+    wait_until: str = NAVIGATION_WAIT_UNTIL,
+    metrics: Optional[SessionMetrics] = None,
+):
     """
-    Execute a single Gemini-issued action.
+    Execute a single Gemini-issued action, then wait for the page to settle.
     Supported: goto, click, type, scroll, wait
+    Selectors may be a11y ids ("e12") from the encoded tree; `encoder` resolves them.
+    Time is split into the "actions" and "settle" phases of `metrics`.
     """
     if not isinstance(action, dict):
         return
     a = action.get("action")
     if not a:
         return
+    if encoder and action.get("selector"):
+        action = {**action, "selector": encoder.selector(action["selector"]) or action["selector"]}
+
+    if a == "wait":
+        # settle for up to the requested duration instead of sleeping blindly
+        duration = int(action.get("duration", 1000))
+        with _span(metrics, "settle"):
+            if settler:
+                await settler.settle(min(duration, PAGE_DEFAULT_TIMEOUT_MS))
+            else:
+                await page.wait_for_timeout(duration)
+        return
 
     try:
-        if a == "goto":
-            url = action["url"]
-            await page.goto(url, wait_until=NAVIGATION_WAIT_UNTIL, timeout=PAGE_DEFAULT_TIMEOUT_MS)
+        with _span(metrics, "actions"):
+            if a == "goto":
+                url = action["url"]
+                await page.goto(url, wait_until=wait_until, timeout=PAGE_DEFAULT_TIMEOUT_MS)
 
-        elif a == "click":
-            selector = action["selector"]
-            await page.click(selector, timeout=PAGE_DEFAULT_TIMEOUT_MS)
+            elif a == "click":
+                selector = action["selector"]
+                await page.click(selector, timeout=PAGE_DEFAULT_TIMEOUT_MS)
 
-        elif a == "type":
-            selector = action["selector"]
-            text = action.get("text", "")
-            # Prefer fill for deterministic results
-            await page.fill(selector, text, timeout=PAGE_DEFAULT_TIMEOUT_MS)
+            elif a == "type":
+                selector = action["selector"]
+                text = action.get("text", "")
+                # Prefer fill for deterministic results
+                await page.fill(selector, text, timeout=PAGE_DEFAULT_TIMEOUT_MS)
 
-        elif a == "scroll":
-            amount = int(action.get("amount", 1000))
-            await page.evaluate(f"window.scrollBy(0, {amount});")
-
-        elif a == "wait":
-            duration = int(action.get("duration", 1000))
-            await page.wait_for_timeout(duration)
-
-        # small settle between steps
-        await page.wait_for_timeout(300)
+            elif a == "scroll":
+                amount = int(action.get("amount", 1000))
+                await page.evaluate(f"window.scrollBy(0, {amount});")
 
     except PlaywrightError:
         # swallow per-action errors to keep loop resilient
-        await page.wait_for_timeout(200)
+        pass
+
+    with _span(metrics, "settle"):
+        if settler:
+            await settler.settle()
+        else:
+            await page.wait_for_timeout(300)
 
 # ============================================================
-# Gemini call (sync SDK -> run in thread)
+# Gemini call (async SDK surface, pooled transport)
 # ============================================================
 
-def _gemini_call_sync(api_key: str, contents: List[Content]) -> str:
-    client = genai.Client(api_key=api_key)
-    res = client.models.generate_content(
-        model=MODEL_NAME,
-        contents=contents,
-        generation_config={"response_mime_type": "application/json"},
-    )
+async def gemini_generate_json(
+    api_key: str,
+    contents: List[Content],
+    metrics: Optional[SessionMetrics] = None,
+) -> str:
+    client = get_async_gemini_client(api_key)
+    async with gemini_semaphore():
+        res = await client.aio.models.generate_content(
+            model=MODEL_NAME,
+            contents=contents,
+            config={"response_mime_type": "application/json"},
+        )
+    if metrics:
+        metrics.add_usage(res.usage_metadata)
     return res.text
 
-async def gemini_generate_json(api_key: str, contents: List[Content]) -> str:
-    return await asyncio.to_thread(_gemini_call_sync, api_key, contents)
-
 # ============================================================
 # Instruction builder
 # ============================================================
@@ -175,6 +215,10 @@ FINAL OUTPUT FORMAT (strict JSON):
   }}
 }}
 
+The accessibility tree is sent as one line per interactive/landmark element: id role "name" state.
+After the first step you receive only changes ("+" added, "-" removed, "~" changed).
+You may use an element id (e.g. "e12") as the "selector" in click/type actions.
+
 If more exploration is needed, respond like:
 {{"actions":[{{"action":"scroll","amount":1200}}]}}
 """.strip()
@@ -183,77 +227,151 @@ If more exploration is needed, respond like:
 # Core: async Playwright + Gemini loop
 # ============================================================
 
-async def run_computer_use_eval_async(url: str, api_key: str, instruction: str) -> str:
+async def run_computer_use_eval_async(
+    url: str,
+    api_key: Optional[str],
+    instruction: str,
+    state_key: Optional[str] = None,
+    flush_state_path: Optional[str] = None,
+    config: Optional[EvalConfig] = None,
+    metrics: Optional[SessionMetrics] = None,
+    asset_cache: Optional[AssetCache] = None,
+) -> str:
     """
     Fully async browser session (Option A):
-      - async_playwright
-      - headless Chromium
-      - storage_state persisted to JSON
-      - Gemini calls via to_thread (non-blocking)
+      - BrowserContext from the shared Chromium pool (see browser_pool.py)
+      - storage_state kept in memory under `state_key` (see storage_state.py),
+        written to `flush_state_path` only when one is given
+      - compact JPEG/WebP screenshots per `config` (see capture.py)
+      - unchanged page states sent as a short text turn (see page_hash.py)
+      - bounded history: last few screenshots verbatim, older turns summarised (see history.py)
+      - compact, diffed accessibility tree with stable element ids (see a11y.py)
+      - optional record/replay of model responses by page content (see cassette.py);
+        `api_key` may be None in replay mode, the Gemini client is only built on a miss
+      - Gemini calls on the cached async client (no executor threads)
+      - per-step phase timings, byte sizes and token usage recorded into `metrics`
+      - actions wait for network + DOM quiescence instead of fixed sleeps (see settle.py)
+      - trackers / heavy media blocked per the job's routing profile (see routing.py)
+      - static assets served from the job's shared `asset_cache` when given (see asset_cache.py)
     """
-    # Prepare initial storage_state (load if exists)
-    load_storage_state: Optional[str | dict] = None
-    if os.path.exists(BROWSER_STATE_PATH):
-        load_storage_state = BROWSER_STATE_PATH
-
-    history: List[Content] = []
-    
-    browser = None
-    context = None
-
-    try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=HEADLESS, args=CHROMIUM_ARGS)
-
-            context_kwargs = {"viewport": VIEWPORT}
-            if load_storage_state:
-                context_kwargs["storage_state"] = load_storage_state
-
-            context = await browser.new_context(**context_kwargs)
+    cfg = config or EvalConfig()
+    metrics = metrics or SessionMetrics()
+    store = get_storage_state_store()
+    load_storage_state: Optional[dict] = store.get(state_key) if state_key else None
+
+    history = ConversationHistory(cfg.history_max_images, cfg.history_token_budget)
+    encoder = A11yEncoder()
+    images_since_full_a11y = 0  # a11y diffs are only valid while their base turn is still verbatim
+    cassette: Optional[Cassette] = None
+    if cfg.cassette_mode != "off":
+        cassette = await Cassette.open(cfg.cassette_dir, cfg.cassette_mode, url, instruction)
+
+    context_kwargs = {"viewport": VIEWPORT}
+    if load_storage_state:
+        context_kwargs["storage_state"] = load_storage_state
+
+    router: Optional[RequestRouter] = None
+    capturer: Optional[ScreenshotCapturer] = None
+    profile = RoutingProfile.named(cfg.routing_profile, cfg.routing_block_patterns)
+    cache_counts: Dict[str, int] = {}
+
+    async with get_browser_pool().context(**context_kwargs) as context:
+        try:
+            cache_handler = asset_cache.handler(cache_counts) if asset_cache else None
+            if profile.enabled:
+                router = RequestRouter(profile, url)
+                router.passthrough = cache_handler
+                await router.install(context)
+            elif cache_handler:
+                await context.route("**/*", cache_handler)
             page = await context.new_page()
             page.set_default_timeout(PAGE_DEFAULT_TIMEOUT_MS)
+            capturer = ScreenshotCapturer(page, cfg)
+            settler = PageSettler(page, cfg)
 
             # Best-effort initial nav
             try:
-                await page.goto(url, wait_until=NAVIGATION_WAIT_UNTIL, timeout=PAGE_DEFAULT_TIMEOUT_MS)
+                await page.goto(url, wait_until=cfg.navigation_wait_until, timeout=PAGE_DEFAULT_TIMEOUT_MS)
             except PlaywrightError:
                 pass # Continue even if first nav fails
+            await settler.settle()
 
-            for step in range(1, MAX_STEPS + 1):
-                screenshot_b64 = await _grab_screenshot_b64(page)
-                a11y_tree = await _grab_a11y_snapshot(page)
+            last_fingerprint: Optional[PageFingerprint] = None
+            unchanged_streak = 0
 
-                parts: List[Part] = []
-                if step == 1:
-                    parts.append(Part.text(instruction))
+            for step in range(1, MAX_STEPS + 1):
+                metrics.begin_step(step)
+                with metrics.span("a11y"):
+                    a11y_tree = await _grab_a11y_snapshot(page)
+                with metrics.span("fingerprint"):
+                    fingerprint = PageFingerprint(*image_hash(await capturer.thumbnail()), a11y_hash(a11y_tree))
+                unchanged = fingerprint.matches(last_fingerprint, cfg.unchanged_phash_distance)
+                metrics.set("unchanged", unchanged)
+                unchanged_streak = unchanged_streak + 1 if unchanged else 0
+                last_fingerprint = fingerprint
+                force_final = bool(cfg.max_unchanged_steps) and unchanged_streak >= cfg.max_unchanged_steps
+
+                if force_final:
+                    lead = STUCK_PROMPT.format(n=unchanged_streak)
+                elif unchanged:
+                    lead = UNCHANGED_PROMPT
+                elif step == 1:
+                    lead = instruction
                 else:
-                    parts.append(Part.text("Here is the updated page state. Continue."))
-
-                # inline image data
-                parts.append(
-                    Part.inline_data(
-                        mime_type="image/png",
-                        data=base64.b64decode(screenshot_b64),
-                    )
+                    lead = "Here is the updated page state. Continue."
+
+                parts: List[Part] = [Part.from_text(text=lead)]
+                images = 0
+                text_chars = len(lead)
+                if not unchanged:
+                    # inline image data (raw bytes, one part per tile)
+                    with metrics.span("screenshot"):
+                        shots = await capturer.capture()
+                    for shot in shots:
+                        parts.append(Part.from_bytes(data=shot.data, mime_type=shot.mime_type))
+                        metrics.add_bytes("screenshot", len(shot.data))
+                        images += 1
+                    # accessibility tree, compact and diffed against the previous turn
+                    with metrics.span("encode"):
+                        allow_diff = images_since_full_a11y + images <= cfg.history_max_images
+                        a11y_text = encoder.encode(a11y_tree, allow_diff=allow_diff)
+                    images_since_full_a11y = images if encoder.last_was_full else images_since_full_a11y + images
+                    parts.append(Part.from_text(text=a11y_text))
+                    metrics.add_bytes("a11y", len(a11y_text.encode("utf-8")))
+                    text_chars += len(a11y_text)
+
+                turn = HistoryTurn(
+                    lead_text=lead,
+                    parts=parts,
+                    images=images,
+                    text_chars=text_chars,
+                    summary=f"[Step {step} screenshot omitted] url={page.url} | {a11y_digest(a11y_tree)}",
+                    a11y_full=not unchanged and encoder.last_was_full,
                 )
-                # accessibility tree as text JSON
-                parts.append(Part.text(json.dumps(a11y_tree)))
-
-                contents = history + [Content(parts=parts)]
-                raw = await gemini_generate_json(api_key, contents)
+                raw: Optional[str] = None
+                with metrics.span("model"):
+                    if cassette:
+                        cassette_key = cassette.next_key(fingerprint)
+                        try:
+                            raw = cassette.lookup(cassette_key)
+                        except CassetteMiss as exc:
+                            return json.dumps({"error": str(exc), "url": url})
+                        metrics.set("cassette_hit", raw is not None)
+                    if raw is None:
+                        contents = history.build(turn)
+                        metrics.add_bytes("request", content_bytes(contents))
+                        raw = await gemini_generate_json(api_key, contents, metrics)
+                        if cassette:
+                            cassette.record(cassette_key, step, fingerprint, raw)
+                metrics.add_bytes("response", len(raw.encode("utf-8")))
 
                 # maintain conversation history for the next turn
-                history.append(Content(parts=parts))
-                history.append(Content(parts=[Part.text(raw)]))
+                history.append(turn, raw)
 
                 # Try strict JSON
                 try:
                     data = json.loads(raw)
                 except json.JSONDecodeError:
-                    if context:
-                        await context.storage_state(path=BROWSER_STATE_PATH)
-                    if browser:
-                        await browser.close()
                     return json.dumps({
                         "error": "Model returned non-JSON response",
                         "raw": raw[:2000],
@@ -262,98 +380,163 @@ async def run_computer_use_eval_async(url: str, api_key: str, instruction: str)
 
                 # Terminal shapes (check for final report)
                 if any(k in data for k in ("overall_rating", "rubric", "issues", "summary")):
-                    if context:
-                        await context.storage_state(path=BROWSER_STATE_PATH)
-                    if browser:
-                        await browser.close()
                     return json.dumps(data)
 
                 # Otherwise execute actions if present
                 actions = data.get("actions", [])
-                if not actions:
-                    break # Model stopped giving actions
+                if not actions or force_final:
+                    break # Model stopped giving actions (or is stuck on an unchanged page)
 
+                metrics.set("actions", [a.get("action") for a in actions if isinstance(a, dict)])
                 for action in actions:
-                    await _apply_action(page, action)
+                    await _apply_action(page, action, encoder, settler, cfg.navigation_wait_until, metrics)
 
             # If we exit loop without final JSON
-            if context:
-                await context.storage_state(path=BROWSER_STATE_PATH)
-            if browser:
-                await browser.close()
             return json.dumps({
                 "error": "Model ended without providing feedback.",
                 "url": url,
             })
 
-    finally:
-        # Ensure state is saved and browser is closed even if something throws mid-loop
-        try:
-            if context:
-                await context.storage_state(path=BROWSER_STATE_PATH)
-        except Exception:
-            pass
-        try:
-            if browser:
-                await browser.close()
-        except Exception:
-            pass
+        finally:
+            if capturer:
+                await capturer.close()
+            if router:
+                metrics.count(router.counts)
+            metrics.count(cache_counts)
+            if cassette:
+                try:
+                    await cassette.save()
+                except OSError:
+                    pass
+            # Snapshot state once, on every exit path; the pool then closes
+            # the context and keeps the browser warm.
+            if state_key:
+                try:
+                    store.put(state_key, await context.storage_state())
+                    if flush_state_path:
+                        await store.flush(state_key, flush_state_path)
+                except Exception:
+                    pass
 
 # ============================================================
 # LangGraph Node Functions
 # ============================================================
 
+# Only what build_exploration_instruction needs; _id is always returned.
+PERSONA_PROJECTION = {"name": 1, "age": 1, "gender": 1, "occupation": 1, "bio": 1}
+# Fan-out drains each page before loading the next, so keep pages well above
+# max_parallel_personas or the tail of every page runs below full parallelism.
+PERSONA_PAGE_SIZE = int(os.getenv("PERSONA_PAGE_SIZE", "500"))
+
+
+def _refs_only(state: Dict[str, Any]) -> bool:
+    """state_mode "refs": personas and feedbacks stay in Mongo, the graph holds ids only."""
+    return state.get("state_mode") == "refs"
+
+
+def _cursor_value(cursor: Optional[str]) -> Any:
+    """State keeps the keyset cursor as a string; Mongo needs the original _id type back."""
+    if cursor and ObjectId.is_valid(cursor):
+        return ObjectId(cursor)
+    return cursor
+
+
+async def _next_persona_page(state: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Loads the page of personas after `cursor` and returns the state update for it.
+    Optional state:
+      - "persona_query": server-side filter
+      - "persona_page_size": personas per page
+      - "state_mode": "refs" keeps only {"_id"} per persona (see _resolve_persona)
+    """
+    page_size = int(state.get("persona_page_size") or PERSONA_PAGE_SIZE)
+    refs = _refs_only(state)
+
+    docs = await get_async_mongo_client().find_page(
+        state["personas_db_name"],
+        state["personas_collection_name"],
+        state.get("persona_query") or {},
+        projection={"_id": 1} if refs else PERSONA_PROJECTION,
+        after_id=_cursor_value(cursor),
+        limit=page_size,
+    )
+    return {
+        "personas": [{"_id": str(d["_id"])} if refs else Persona.from_mongo(d) for d in docs],
+        "index": 0,
+        "persona_cursor": str(docs[-1]["_id"]) if docs else cursor,
+        "personas_exhausted": len(docs) < page_size,
+    }
+
 async def load_personas(state: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Loads personas from Mongo in a worker thread.
+    Loads the first page of personas from Mongo; later pages are pulled by
+    check_status / load_next_page as each page is used up.
     Expects:
       - state["personas_db_name"]
       - state["personas_collection_name"]
     """
-    def _load():
-        mongo = get_mongo_client()
-        docs = mongo.find(
-            state["personas_db_name"],
-            state["personas_collection_name"],
-            {}
-        )
-        return [Persona.from_mongo(d).to_dict() for d in docs]
-
-    personas = await asyncio.to_thread(_load)
+    page = await _next_persona_page(state, None)
     return {
-        "personas": personas,
-        "index": 0,
+        **page,
         "feedbacks": [],
         "current_feedback": None,
         "status": "running",
     }
 
-async def process_persona(state: Dict[str, Any]) -> Dict[str, Any]:
+async def load_next_page(state: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Runs the async Playwright + Gemini computer-use loop for the current persona.
-    Expects in state:
-      - "gemini_api_key"
-      - "mvp_link"
-      - optional "app_context"
+    Fan-out mode: runs once every branch of the current page has finished
+    and replaces state["personas"] with the next page (empty when done).
+
+    Known limit: pages are a superstep barrier. While the last branches of a
+    page finish, the freed slots stay idle, so the slowdown is about one
+    persona's duration per page; size pages at many times the parallelism.
     """
-    personas = state.get("personas") or []
-    idx = state.get("index", 0)
+    if state.get("personas_exhausted"):
+        return {"personas": []}
+    return await _next_persona_page(state, state.get("persona_cursor"))
+
+def resolve_parallelism(state: Dict[str, Any]) -> int:
+    """
+    Number of personas to evaluate at once. Missing / 1 keeps the sequential loop,
+    0 (or negative) means one browser session per CPU core.
+    """
+    value = state.get("max_parallel_personas")
+    if value is None:
+        return 1
+    value = int(value)
+    if value <= 0:
+        return os.cpu_count() or 1
+    return value
 
-    if idx >= len(personas):
-        return {"status": "completed"}
 
-    persona = Persona.from_mongo(personas[idx])
+# One semaphore per job so concurrent jobs don't share a budget.
+_persona_semaphores: Dict[str, asyncio.Semaphore] = {}
 
+
+def _persona_semaphore(job_id: str, limit: int) -> asyncio.Semaphore:
+    sem = _persona_semaphores.get(job_id)
+    if sem is None:
+        sem = asyncio.Semaphore(limit)
+        _persona_semaphores[job_id] = sem
+    return sem
+
+
+async def _evaluate(state: Dict[str, Any], persona: Persona) -> Dict[str, Any]:
+    """
+    Runs the computer-use loop for a single persona and returns the
+    {"persona_id", "text", "raw_actions"} feedback record.
+    """
+    cfg = EvalConfig.from_state(state)
     api_key = state.get("gemini_api_key")
-    if not api_key:
+    # replay serves every step from the cassette, so it runs offline without a key
+    if not api_key and cfg.cassette_mode != "replay":
         return {
-            "current_feedback": {
-                "persona_id": persona.id,
-                "text": json.dumps({
-                    "error": "Missing Gemini API key",
-                    "persona_id": persona.id
-                })
-            }
+            "persona_id": persona.id,
+            "text": json.dumps({
+                "error": "Missing Gemini API key",
+                "persona_id": persona.id
+            })
         }
 
     instruction = build_exploration_instruction(
@@ -362,11 +545,24 @@ async def process_persona(state: Dict[str, Any]) -> Dict[str, Any]:
         app_context=state.get("app_context", "No context"),
     )
 
+    metrics = SessionMetrics()
+    asset_cache = None
+    if cfg.asset_cache:
+        asset_cache = get_asset_cache(
+            str(state.get("job_id") or ""),
+            max_mb=cfg.asset_cache_max_mb,
+            disk_dir=cfg.asset_cache_dir,
+        )
     try:
         feedback_json = await run_computer_use_eval_async(
             url=state["mvp_link"],
             api_key=api_key,
             instruction=instruction,
+            state_key=storage_state_key(state, persona.id),
+            flush_state_path=state.get("browser_state_flush_path"),
+            config=cfg,
+            metrics=metrics,
+            asset_cache=asset_cache,
         )
     except Exception as exc:
         feedback_json = json.dumps({
@@ -376,58 +572,203 @@ async def process_persona(state: Dict[str, Any]) -> Dict[str, Any]:
         })
 
     return {
-        "current_feedback": {
-            "persona_id": persona.id,
-            "text": feedback_json,
-        }
+        "persona_id": persona.id,
+        "text": feedback_json,
+        "raw_actions": metrics.to_dict(),
     }
 
-async def write_feedback(state: Dict[str, Any]) -> Dict[str, Any]:
+
+async def _resolve_persona(state: Dict[str, Any], entry: Any) -> Persona:
     """
-    Persists the current feedback to Mongo.
-    Needs in state:
-      - "feedback_db_name"
-      - "feedback_collection_name"
-      - "job_id"
+    Persona for a page entry: the record itself in full mode, fetched from
+    Mongo when the entry is only an {"_id"} reference.
     """
-    cur = state.get("current_feedback")
-    if not cur:
+    if isinstance(entry, Persona):
+        return entry
+    if set(entry) - {"_id"}:
+        return Persona.from_mongo(entry)
+    doc = await get_async_mongo_client().find_one(
+        state["personas_db_name"],
+        state["personas_collection_name"],
+        {"_id": _cursor_value(entry["_id"])},
+        projection=PERSONA_PROJECTION,
+    )
+    return Persona.from_mongo(doc or entry)
+
+
+def feedback_failed(text: Optional[str]) -> bool:
+    """True when a feedback payload is an error report: JSON with a top-level "error" key."""
+    try:
+        data = json.loads(text or "")
+    except (TypeError, ValueError):
+        return True
+    return not isinstance(data, dict) or "error" in data
+
+
+def _feedback_ref(cur: Dict[str, Any], feedback_id: str) -> Dict[str, Any]:
+    """
+    What the graph keeps per persona: a reference to the stored feedback plus
+    its timing totals, never the report text or per-step detail.
+    """
+    ref = {
+        "persona_id": cur["persona_id"],
+        "feedback_id": feedback_id,
+        "ok": not feedback_failed(cur.get("text")),
+    }
+    if cur.get("raw_actions"):
+        ref["timing"] = cur["raw_actions"]["totals"]
+    return ref
+
+
+def _feedback_update(state: Dict[str, Any], cur: Dict[str, Any], feedback_id: str) -> Dict[str, Any]:
+    """
+    The feedbacks reducer input; nothing in refs mode, where the rollup reads Mongo
+    instead. operator.add copies the accumulated list on each write, so full mode
+    costs O(personas so far) per persona.
+    """
+    if _refs_only(state):
         return {}
+    return {"feedbacks": [_feedback_ref(cur, feedback_id)]}
+
 
+async def _job_rollup(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Job-level timing summary. Taken from the feedback refs in state, or in refs
+    mode from the stored feedback documents (call after _flush_feedback).
+    """
+    if not _refs_only(state):
+        return rollup([f.get("timing") for f in state.get("feedbacks") or []])
+    if not (state.get("feedback_db_name") and state.get("feedback_collection_name")):
+        return rollup([])
+    totals = []
+    async for doc in get_async_mongo_client().iter_find(
+        state["feedback_db_name"],
+        state["feedback_collection_name"],
+        {"job": state["job_id"]},
+        projection={"raw_actions.totals": 1},
+    ):
+        totals.append((doc.get("raw_actions") or {}).get("totals"))
+    return rollup(totals)
+
+
+async def _persist_feedback(state: Dict[str, Any], cur: Dict[str, Any]) -> str:
+    """
+    Queues the feedback on the buffered writer (see feedback_writer.py) and
+    returns its pre-assigned _id; the document reaches Mongo on the next flush.
+    """
     fb = Feedback.new(
         job=state["job_id"],
         persona=cur["persona_id"],
         feedback=cur["text"],
         rating=None,
         rubric_breakdown=None,
-        raw_actions=None,
+        raw_actions=cur.get("raw_actions"),
     )
     doc = fb.to_mongo()
+    doc["_id"] = ObjectId()
 
-    def _write():
-        mongo = get_mongo_client()
-        mongo.insert_one(
-            state["feedback_db_name"],
-            state["feedback_collection_name"],
-            doc
-        )
+    writer = get_feedback_writer(state["feedback_db_name"], state["feedback_collection_name"])
+    await writer.add(doc)
+    return str(doc["_id"])
+
+
+async def _flush_feedback(state: Dict[str, Any]) -> None:
+    if state.get("feedback_db_name") and state.get("feedback_collection_name"):
+        await get_feedback_writer(state["feedback_db_name"], state["feedback_collection_name"]).flush()
+
+
+async def process_persona(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs the async Playwright + Gemini computer-use loop for the current persona.
+    Expects in state:
+      - "gemini_api_key"
+      - "mvp_link"
+      - optional "app_context"
+    """
+    personas = state.get("personas") or []
+    idx = state.get("index", 0)
+
+    if idx >= len(personas):
+        return {"status": "completed"}
+
+    persona = await _resolve_persona(state, personas[idx])
+    return {"current_feedback": await _evaluate(state, persona)}
 
-    await asyncio.to_thread(_write)
+async def write_feedback(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Queues the current feedback for a bulk write to Mongo.
+    Needs in state:
+      - "feedback_db_name"
+      - "feedback_collection_name"
+      - "job_id"
+    """
+    cur = state.get("current_feedback")
+    if not cur:
+        return {}
 
-    feedbacks = list(state.get("feedbacks") or [])
-    feedbacks.append(cur)
+    feedback_id = await _persist_feedback(state, cur)
 
     return {
-        "feedbacks": feedbacks,
+        **_feedback_update(state, cur, feedback_id),
         "current_feedback": None,
     }
 
+async def evaluate_persona(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fan-out branch: evaluates one persona and writes its feedback immediately.
+    Receives the payload built by persona_tasks() rather than the full graph state:
+      - "persona" plus the job-level fields from AgentState
+    """
+    limit = resolve_parallelism(state)
+
+    async with _persona_semaphore(state["job_id"], limit):
+        persona = await _resolve_persona(state, state["persona"])
+        cur = await _evaluate(state, persona)
+
+    feedback_id = await _persist_feedback(state, cur)
+    return _feedback_update(state, cur, feedback_id)
+
+def persona_tasks(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Builds one evaluate_persona payload per persona in the current page. The
+    persona list itself is left out so each branch doesn't carry a copy of it.
+    """
+    shared = {
+        k: v for k, v in state.items()
+        if k not in ("personas", "feedbacks", "current_feedback", "index", "persona_cursor")
+    }
+    return [{**shared, "persona": p} for p in state.get("personas") or []]
+
+async def _complete_job(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Flushes buffered feedback, releases per-job resources and builds the final update."""
+    job_id = str(state.get("job_id") or "")
+    await _flush_feedback(state)
+    _persona_semaphores.pop(job_id, None)
+    get_storage_state_store().drop_job(job_id)
+    await drop_asset_cache(job_id)
+    return {"status": "completed", "timing_rollup": await _job_rollup(state)}
+
+async def finish_job(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Join point after the fan-out; every branch has already queued its feedback,
+    this flushes whatever is still buffered.
+    """
+    return await _complete_job(state)
+
 async def check_status(state: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Advances to the next persona or marks completed.
+    Advances to the next persona, pulls the next page when this one is used up,
+    or marks completed.
     """
     idx = state.get("index", 0)
     personas = state.get("personas") or []
-    if idx + 1 >= len(personas):
-        return {"status": "completed"}
-    return {"index": idx + 1}
\ No newline at end of file
+    if idx + 1 < len(personas):
+        return {"index": idx + 1}
+
+    if not state.get("personas_exhausted"):
+        page = await _next_persona_page(state, state.get("persona_cursor"))
+        if page["personas"]:
+            return page
+
+    return await _complete_job(state)
+
@@ -0,0 +1,131 @@
+# page_hash.py
+from __future__ import annotations
+import json
+import zlib
+import struct
+import hashlib
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+HASH_SIZE = 8  # dHash grid: 8 rows x (8 + 1) columns -> 64-bit hash
+
+
+# ============================================================
+# Minimal PNG decoder (8-bit RGB/RGBA, non-interlaced)
+# ============================================================
+# Chromium emits exactly this for thumbnails, which keeps the hash
+# dependency-free; anything else returns None and callers fall back
+# to an exact byte hash.
+
+def _paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def decode_png_gray(data: bytes) -> Optional[Tuple[int, int, List[int]]]:
+    """Returns (width, height, grayscale pixels row-major) or None if unsupported."""
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        return None
+    pos = 8
+    width = height = 0
+    bpp = 0
+    idat = bytearray()
+    while pos < len(data):
+        length, ctype = struct.unpack(">I4s", data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if ctype == b"IHDR":
+            width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", chunk)
+            if depth != 8 or interlace or color not in (2, 6):
+                return None
+            bpp = 3 if color == 2 else 4
+        elif ctype == b"IDAT":
+            idat += chunk
+        elif ctype == b"IEND":
+            break
+    if not bpp:
+        return None
+
+    raw = zlib.decompress(bytes(idat))
+    stride = width * bpp
+    prev = bytearray(stride)
+    gray: List[int] = []
+    i = 0
+    for _ in range(height):
+        ftype = raw[i]
+        row = bytearray(raw[i + 1:i + 1 + stride])
+        i += 1 + stride
+        for x in range(stride):
+            left = row[x - bpp] if x >= bpp else 0
+            up = prev[x]
+            if ftype == 1:
+                row[x] = (row[x] + left) & 0xFF
+            elif ftype == 2:
+                row[x] = (row[x] + up) & 0xFF
+            elif ftype == 3:
+                row[x] = (row[x] + ((left + up) >> 1)) & 0xFF
+            elif ftype == 4:
+                upleft = prev[x - bpp] if x >= bpp else 0
+                row[x] = (row[x] + _paeth(left, up, upleft)) & 0xFF
+        for x in range(0, stride, bpp):
+            gray.append((row[x] * 299 + row[x + 1] * 587 + row[x + 2] * 114) // 1000)
+        prev = row
+    return width, height, gray
+
+
+# ============================================================
+# Hashes
+# ============================================================
+
+def dhash(width: int, height: int, gray: List[int], size: int = HASH_SIZE) -> int:
+    """Difference hash: box-average to (size+1) x size, compare horizontal neighbours."""
+    cols, rows = size + 1, size
+    cells: List[float] = []
+    for r in range(rows):
+        y0, y1 = r * height // rows, max((r + 1) * height // rows, r * height // rows + 1)
+        for c in range(cols):
+            x0, x1 = c * width // cols, max((c + 1) * width // cols, c * width // cols + 1)
+            total = 0
+            for y in range(y0, min(y1, height)):
+                base = y * width
+                total += sum(gray[base + x0:base + min(x1, width)])
+            cells.append(total / ((y1 - y0) * (x1 - x0)))
+    bits = 0
+    for r in range(rows):
+        for c in range(size):
+            bits = (bits << 1) | (cells[r * cols + c] < cells[r * cols + c + 1])
+    return bits
+
+
+def image_hash(png_bytes: bytes) -> Tuple[Optional[int], str]:
+    """(perceptual hash or None, exact sha1) of a PNG thumbnail."""
+    digest = hashlib.sha1(png_bytes).hexdigest()
+    try:
+        decoded = decode_png_gray(png_bytes)
+    except (zlib.error, struct.error, IndexError):
+        decoded = None
+    if not decoded or not decoded[0] or not decoded[1]:
+        return None, digest
+    return dhash(*decoded), digest
+
+
+def a11y_hash(tree: Any) -> str:
+    return hashlib.sha1(json.dumps(tree, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PageFingerprint:
+    phash: Optional[int]
+    image_sha1: str
+    a11y: str
+
+    def matches(self, other: Optional["PageFingerprint"], max_distance: int) -> bool:
+        """Same a11y tree and a screenshot within `max_distance` bits (exact match without a phash)."""
+        if other is None or self.a11y != other.a11y:
+            return False
+        if self.phash is None or other.phash is None:
+            return self.image_sha1 == other.image_sha1
+        return bin(self.phash ^ other.phash).count("1") <= max_distance
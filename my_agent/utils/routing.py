@@ -0,0 +1,130 @@
+# routing.py
+from __future__ import annotations
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import Error as PlaywrightError
+
+# Analytics, tag managers, session replay and ad pixels. Matched as host suffixes.
+TRACKER_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "facebook.com/tr",
+    "analytics.tiktok.com",
+    "static.hotjar.com",
+    "script.hotjar.com",
+    "cdn.segment.com",
+    "api.segment.io",
+    "cdn.mxpnl.com",
+    "api-js.mixpanel.com",
+    "cdn.amplitude.com",
+    "api2.amplitude.com",
+    "fullstory.com",
+    "clarity.ms",
+    "js.hs-analytics.net",
+    "js.hs-scripts.com",
+    "snap.licdn.com",
+    "bat.bing.com",
+    "static.ads-twitter.com",
+    "plausible.io",
+    "cdn.heapanalytics.com",
+]
+
+_FONT_TYPES = {"font"}
+
+
+@dataclass
+class RoutingProfile:
+    """What the evaluation browser should not download."""
+    block_patterns: List[str] = field(default_factory=list)         # host suffixes, or URL globs with "*"
+    block_third_party_types: List[str] = field(default_factory=list)  # resource types blocked off-site
+    block_types: List[str] = field(default_factory=list)             # resource types blocked everywhere
+    stub_fonts: bool = False                                         # answer font requests with an empty body
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.block_patterns or self.block_third_party_types or self.block_types or self.stub_fonts)
+
+    @staticmethod
+    def named(name: str, extra_patterns: Optional[List[str]] = None) -> "RoutingProfile":
+        """
+        "off":     route nothing
+        "default": trackers everywhere, third-party media
+        "strict":  trackers, all media, stubbed fonts
+        """
+        extra = list(extra_patterns or [])
+        if name == "off":
+            return RoutingProfile(block_patterns=extra)
+        if name == "strict":
+            return RoutingProfile(block_patterns=TRACKER_HOSTS + extra, block_types=["media"], stub_fonts=True)
+        return RoutingProfile(block_patterns=TRACKER_HOSTS + extra, block_third_party_types=["media"])
+
+
+def _site(host: str) -> str:
+    """Naive registrable domain (last two labels); good enough to tell first from third party."""
+    labels = host.split(".")
+    return ".".join(labels[-2:]) if len(labels) >= 2 else host
+
+
+def _matches(url: str, host: str, pattern: str) -> bool:
+    if "*" in pattern:
+        return fnmatch(url, pattern)
+    if "/" in pattern:
+        return pattern in url
+    return host == pattern or host.endswith("." + pattern)
+
+
+class RequestRouter:
+    """
+    One context.route("**/*") handler that applies a RoutingProfile and counts
+    what it blocked. Requests it lets through go to `passthrough`, so other
+    interceptors can chain behind it.
+    """
+
+    def __init__(self, profile: RoutingProfile, first_party_url: str):
+        self.profile = profile
+        self.first_party = _site(urlsplit(first_party_url).hostname or "")
+        self.counts: Dict[str, int] = {}
+        self.passthrough: Optional[Callable] = None
+
+    def _count(self, key: str) -> None:
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def classify(self, url: str, resource_type: str) -> Optional[str]:
+        """Reason to block/stub the request, or None to let it through."""
+        host = urlsplit(url).hostname or ""
+        p = self.profile
+        if any(_matches(url, host, pat) for pat in p.block_patterns):
+            return "tracker"
+        if resource_type in p.block_types:
+            return resource_type
+        if resource_type in p.block_third_party_types and _site(host) != self.first_party:
+            return resource_type
+        if p.stub_fonts and resource_type in _FONT_TYPES:
+            return "font"
+        return None
+
+    async def handle(self, route, request) -> None:
+        reason = self.classify(request.url, request.resource_type)
+        try:
+            if reason == "font":
+                self._count("stubbed.font")
+                await route.fulfill(status=200, body=b"", content_type="font/woff2")
+            elif reason:
+                self._count(f"blocked.{reason}")
+                await route.abort("blockedbyclient")
+            elif self.passthrough:
+                await self.passthrough(route, request)
+            else:
+                await route.continue_()
+        except PlaywrightError:
+            # page/context closed while the request was in flight
+            pass
+
+    async def install(self, context) -> None:
+        await context.route("**/*", self.handle)
@@ -1,8 +1,8 @@
 
 # schema.py
 from __future__ import annotations
-from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, fields
+from typing import Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime
 
 
@@ -10,7 +10,10 @@ def now_iso() -> str:
     return datetime.utcnow().isoformat(timespec="seconds") + "Z"
 
 
-@dataclass
+# Records are slotted and convert to/from flat rows (field values in declaration
+# order), which is what codec.py packs; no per-field dict keys on the wire.
+
+@dataclass(slots=True)
 class Persona:
     id: Optional[str]
     name: str
@@ -35,10 +38,17 @@ class Persona:
         )
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {name: getattr(self, name) for name in _PERSONA_FIELDS}
+
+    def to_row(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in _PERSONA_FIELDS)
 
+    @staticmethod
+    def from_row(row: Sequence[Any]) -> "Persona":
+        return Persona(*row)
 
-@dataclass
+
+@dataclass(slots=True)
 class Feedback:
     id: Optional[str]
     job: str
@@ -46,7 +56,7 @@ class Feedback:
     feedback: str
     rating: Optional[float] = None
     rubric_breakdown: Optional[Dict[str, Any]] = None
-    raw_actions: Optional[Dict[str, Any]] = None
+    raw_actions: Optional[Dict[str, Any]] = None     # per-step timings / bytes / tokens (see timing.py)
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
 
@@ -69,5 +79,20 @@ class Feedback:
 
     def to_mongo(self) -> Dict[str, Any]:
         # Do not include None fields for cleanliness
-        data = {k: v for k, v in self.__dict__.items() if v is not None}
+        data = {}
+        for name in _FEEDBACK_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
         return data
+
+    def to_row(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in _FEEDBACK_FIELDS)
+
+    @staticmethod
+    def from_row(row: Sequence[Any]) -> "Feedback":
+        return Feedback(*row)
+
+
+_PERSONA_FIELDS = tuple(f.name for f in fields(Persona))
+_FEEDBACK_FIELDS = tuple(f.name for f in fields(Feedback))
@@ -0,0 +1,91 @@
+# settle.py
+from __future__ import annotations
+import asyncio
+from typing import Optional, Set
+
+from playwright.async_api import Error as PlaywrightError
+
+from .config import EvalConfig
+
+# Resolves once the DOM has had no mutations for quietMs, or after timeoutMs.
+_DOM_QUIET_JS = """
+([quietMs, timeoutMs]) => new Promise((resolve) => {
+  const start = performance.now();
+  let last = start;
+  const obs = new MutationObserver(() => { last = performance.now(); });
+  obs.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+  const tick = () => {
+    const now = performance.now();
+    if (now - last >= quietMs || now - start >= timeoutMs) {
+      obs.disconnect();
+      resolve(now - start);
+    } else {
+      setTimeout(tick, Math.min(50, quietMs));
+    }
+  };
+  setTimeout(tick, Math.min(50, quietMs));
+})
+"""
+
+# Streaming requests never "finish"; they must not hold the page unsettled.
+_IGNORED_RESOURCE_TYPES = {"eventsource", "websocket", "media"}
+
+
+class PageSettler:
+    """
+    Waits until a page is actually idle instead of sleeping a fixed time:
+    no in-flight requests for `settle_quiet_ms` and a DOM mutation window of
+    the same length, both capped by `settle_timeout_ms`.
+    """
+
+    def __init__(self, page, cfg: EvalConfig):
+        self.page = page
+        self.quiet_ms = cfg.settle_quiet_ms
+        self.timeout_ms = cfg.settle_timeout_ms
+        self._inflight: Set[object] = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+
+    def _on_request(self, request) -> None:
+        if request.resource_type in _IGNORED_RESOURCE_TYPES:
+            return
+        self._inflight.add(request)
+        self._idle.clear()
+
+    def _on_done(self, request) -> None:
+        self._inflight.discard(request)
+        if not self._inflight:
+            self._idle.set()
+
+    async def _network_quiet(self, deadline: float) -> None:
+        loop = asyncio.get_running_loop()
+        quiet_s = self.quiet_ms / 1000
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+            # idle now; stay idle for the quiet window
+            await asyncio.sleep(min(quiet_s, max(0.0, deadline - loop.time())))
+            if self._idle.is_set():
+                return
+
+    async def _dom_quiet(self, timeout_ms: int) -> None:
+        try:
+            await self.page.evaluate(_DOM_QUIET_JS, [self.quiet_ms, timeout_ms])
+        except PlaywrightError:
+            # navigation destroyed the execution context; the network wait still applies
+            pass
+
+    async def settle(self, timeout_ms: Optional[int] = None) -> None:
+        timeout_ms = self.timeout_ms if timeout_ms is None else timeout_ms
+        if timeout_ms <= 0:
+            return
+        deadline = asyncio.get_running_loop().time() + timeout_ms / 1000
+        await asyncio.gather(self._network_quiet(deadline), self._dom_quiet(timeout_ms))
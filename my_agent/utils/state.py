@@ -1,6 +1,7 @@
 # state.py
 from __future__ import annotations
-from typing import TypedDict, Dict, List, Optional, Any
+import operator
+from typing import Annotated, TypedDict, Dict, List, Optional, Any
 from uuid import uuid4
 
 
@@ -9,10 +10,26 @@ class AgentState(TypedDict, total=False):
     Canonical state for the LangGraph agent.
 
     Workflow:
-      1) load_personas reads personas from (personas_db_name, personas_collection_name)
+      1) load_personas reads the first page of personas from (personas_db_name, personas_collection_name);
+         further pages are pulled lazily as each page is used up
       2) process_persona uses Gemini Computer Use on mvp_link with the current persona
-      3) write_feedback writes to database "feedback" (fixed) and collection feedback_collection_name
+      3) write_feedback queues feedback for a bulk insert into (feedback_db_name, feedback_collection_name);
+         the buffer is flushed by size/time and when the job completes
       4) loop until all personas processed → END
+
+    With max_parallel_personas > 1 the loop is replaced by a fan-out: every
+    persona runs as its own evaluate_persona branch and writes its feedback
+    as soon as it finishes.
+
+    With state_mode="refs" the checkpointed state stays the same size however
+    many personas a job has: pages hold persona ids, each persona is fetched
+    when it is evaluated, no per-persona feedback refs are accumulated, and
+    the timing rollup is read back from the stored feedback.
+
+    In the default "full" mode `feedbacks` grows by one small ref (ids, ok flag,
+    timing totals) per persona. operator.add builds a new list on every write
+    and each checkpoint serialises the whole list, so the cost per persona is
+    O(personas so far); use refs mode for large jobs.
     """
 
     # Job details
@@ -34,12 +51,44 @@ class AgentState(TypedDict, total=False):
     gemini_api_key: Optional[str]       # If not using Vertex, use direct API key
 
     # Persona processing
-    personas: List[Dict[str, Any]]      # Loaded persona dicts
-    index: int                          # Current persona index (0-based)
+    personas: List[Any]                 # Current page: Persona records ({"_id"} dicts in refs mode)
+    index: int                          # Current persona index within the page (0-based)
+    persona_query: Dict[str, Any]       # Optional server-side filter on the personas collection
+    persona_page_size: int              # Personas loaded per page (fan-out: keep >> max_parallel_personas)
+    persona_cursor: Optional[str]       # _id of the last persona loaded (keyset cursor)
+    personas_exhausted: bool            # True once the last page has been loaded
+    max_parallel_personas: int          # >1 fans personas out concurrently; 0 = one per CPU core
+    state_mode: str                     # "full" (default) | "refs": ids only, documents read from Mongo on demand
 
     # Outputs
-    feedbacks: List[Dict[str, Any]]     # Accumulated feedback
+    feedbacks: Annotated[List[Dict[str, Any]], operator.add]  # Refs: persona_id, feedback_id, ok, timing; list copied per write (empty in refs mode)
     current_feedback: Optional[Dict[str, Any]]  # Temp buffer for current persona
+    timing_rollup: Dict[str, Any]       # Job-level phase/byte/token totals (per-step detail is in Feedback.raw_actions)
+
+    # Browser storage state (cookies / localStorage), held in memory
+    browser_state_scope: str            # "persona" (default) | "job" — who shares a cookie jar
+    browser_state_flush_path: Optional[str]     # Opt-in: also write state to this file ("{key}" is substituted)
+
+    # Evaluation tuning (optional, see utils/config.py for defaults)
+    screenshot_mode: str                # "viewport" | "tiled" | "full"
+    screenshot_format: str              # "jpeg" | "webp" | "png"
+    screenshot_quality: int             # 0-100 for jpeg/webp
+    screenshot_max_width: int           # Downscale captures wider than this
+    screenshot_max_tiles: int           # Max viewport-heights captured for tiled/full
+    unchanged_phash_distance: int       # dHash bit tolerance for "page unchanged"
+    max_unchanged_steps: int            # Force the final report after N unchanged states
+    history_max_images: int             # Screenshots kept verbatim in the model history
+    history_token_budget: int           # Estimated token cap per model request (0 = none)
+    navigation_wait_until: str          # goto() wait_until ("commit" | "domcontentloaded" | "load")
+    settle_quiet_ms: int                # Network + DOM quiet window after each action
+    settle_timeout_ms: int              # Cap on each settle wait
+    routing_profile: str                # "off" | "default" | "strict" request blocking
+    routing_block_patterns: List[str]   # Extra host suffixes / URL globs to block
+    asset_cache: bool                   # Share static assets between the job's personas
+    asset_cache_max_mb: int             # In-memory cap for that cache
+    asset_cache_dir: Optional[str]      # Optional on-disk layer for that cache
+    cassette_mode: str                  # "off" | "record" | "replay" | "auto"
+    cassette_dir: str                   # Directory holding recorded sessions
 
     # Runtime deps (managed internally)
     browser_state: Optional[Dict[str, Any]]     # If you want to reuse playwright browser
@@ -0,0 +1,92 @@
+# storage_state.py
+from __future__ import annotations
+import os
+import copy
+import json
+import asyncio
+from typing import Any, Dict, Optional
+
+# Optional snapshot (cookies / localStorage) every new session starts from.
+BROWSER_STATE_SEED_PATH = os.getenv("BROWSER_STATE_SEED_PATH", "playwright_state.json")
+
+
+class StorageStateStore:
+    """
+    In-memory Playwright storage_state, keyed per job or per job+persona.
+
+    Sessions never touch disk on the hot path: the seed file is read once,
+    states are kept in a dict, and writing one back out is an explicit flush().
+    """
+
+    def __init__(self, seed_path: Optional[str] = BROWSER_STATE_SEED_PATH):
+        self.seed_path = seed_path
+        self._seed: Optional[Dict[str, Any]] = None
+        self._seed_loaded = False
+        self._states: Dict[str, Dict[str, Any]] = {}
+
+    def _get_seed(self) -> Optional[Dict[str, Any]]:
+        if not self._seed_loaded:
+            self._seed_loaded = True
+            if self.seed_path and os.path.exists(self.seed_path):
+                try:
+                    with open(self.seed_path, "r", encoding="utf-8") as fh:
+                        self._seed = json.load(fh)
+                except (OSError, ValueError):
+                    self._seed = None
+        return self._seed
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        State for `key`, falling back to the seed snapshot. Returns a copy
+        so callers can hand it to new_context() without sharing dicts.
+        """
+        state = self._states.get(key) or self._get_seed()
+        return copy.deepcopy(state) if state else None
+
+    def put(self, key: str, state: Dict[str, Any]) -> None:
+        self._states[key] = state
+
+    def drop_job(self, job_id: str) -> None:
+        """Forget every state that belongs to a finished job."""
+        prefix = f"{job_id}:"
+        for key in [k for k in self._states if k == job_id or k.startswith(prefix)]:
+            del self._states[key]
+
+    async def flush(self, key: str, path: str) -> None:
+        """
+        Opt-in persistence. A "{key}" placeholder in `path` is replaced so
+        concurrent sessions don't overwrite each other's file.
+        """
+        state = self._states.get(key)
+        if state is None:
+            return
+        target = path.replace("{key}", key.replace(":", "_"))
+
+        def _write():
+            with open(target, "w", encoding="utf-8") as fh:
+                json.dump(state, fh)
+
+        await asyncio.to_thread(_write)
+
+
+def storage_state_key(state: Dict[str, Any], persona_id: Optional[str]) -> str:
+    """
+    Key for a session's storage state. Scope comes from state["browser_state_scope"]:
+      - "persona" (default): each persona starts from the seed and keeps its own cookies
+      - "job": personas in the same job share one cookie jar
+    """
+    job_id = str(state.get("job_id") or "")
+    if state.get("browser_state_scope") == "job":
+        return job_id
+    return f"{job_id}:{persona_id or ''}"
+
+
+# Global singleton (lazy)
+_store_instance: Optional[StorageStateStore] = None
+
+
+def get_storage_state_store() -> StorageStateStore:
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = StorageStateStore()
+    return _store_instance
@@ -0,0 +1,133 @@
+# timing.py
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+PHASES = ("a11y", "fingerprint", "screenshot", "encode", "model", "actions", "settle")
+
+
+def content_bytes(contents) -> int:
+    """Approximate request payload: UTF-8 text plus raw inline image bytes."""
+    total = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                total += len(part.text.encode("utf-8"))
+            if part.inline_data and part.inline_data.data:
+                total += len(part.inline_data.data)
+    return total
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * pct // 100) - 1)]
+
+
+class SessionMetrics:
+    """
+    Per-step timing spans, byte sizes and token usage for one persona session.
+    Serialised into Feedback.raw_actions by to_dict().
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps: List[Dict[str, Any]] = []
+        self.counters: Dict[str, int] = {}   # session-wide counts, e.g. blocked requests
+
+    @property
+    def current(self) -> Dict[str, Any]:
+        return self.steps[-1]
+
+    def begin_step(self, step: int) -> None:
+        self.steps.append({"step": step, "timings_ms": {}, "bytes": {}, "tokens": {}})
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings = self.current["timings_ms"]
+            timings[phase] = round(timings.get(phase, 0.0) + (time.perf_counter() - start) * 1000, 2)
+
+    def add_bytes(self, kind: str, size: int) -> None:
+        sizes = self.current["bytes"]
+        sizes[kind] = sizes.get(kind, 0) + size
+
+    def set(self, key: str, value: Any) -> None:
+        self.current[key] = value
+
+    def count(self, counts: Dict[str, int]) -> None:
+        for k, v in counts.items():
+            self.counters[k] = self.counters.get(k, 0) + v
+
+    def add_usage(self, usage: Any) -> None:
+        """Records a Gemini usage_metadata object (or None)."""
+        if usage is None or not self.steps:
+            return
+        tokens = self.current["tokens"]
+        for field, key in (
+            ("prompt_token_count", "prompt"),
+            ("candidates_token_count", "output"),
+            ("total_token_count", "total"),
+        ):
+            value = getattr(usage, field, None)
+            if value:
+                tokens[key] = tokens.get(key, 0) + value
+
+    def totals(self) -> Dict[str, Any]:
+        timings: Dict[str, float] = {}
+        sizes: Dict[str, int] = {}
+        tokens: Dict[str, int] = {}
+        for step in self.steps:
+            for k, v in step["timings_ms"].items():
+                timings[k] = round(timings.get(k, 0.0) + v, 2)
+            for k, v in step["bytes"].items():
+                sizes[k] = sizes.get(k, 0) + v
+            for k, v in step["tokens"].items():
+                tokens[k] = tokens.get(k, 0) + v
+        return {
+            "steps": len(self.steps),
+            "wall_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "timings_ms": timings,
+            "bytes": sizes,
+            "tokens": tokens,
+            "counters": dict(self.counters),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"steps": self.steps, "totals": self.totals()}
+
+
+def rollup(totals: List[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Job-level summary from each persona's SessionMetrics.totals()."""
+    sessions = [t for t in totals if t]
+    timings: Dict[str, float] = {}
+    sizes: Dict[str, int] = {}
+    tokens: Dict[str, int] = {}
+    counters: Dict[str, int] = {}
+    for t in sessions:
+        for k, v in t.get("counters", {}).items():
+            counters[k] = counters.get(k, 0) + v
+        for k, v in t.get("timings_ms", {}).items():
+            timings[k] = round(timings.get(k, 0.0) + v, 2)
+        for k, v in t.get("bytes", {}).items():
+            sizes[k] = sizes.get(k, 0) + v
+        for k, v in t.get("tokens", {}).items():
+            tokens[k] = tokens.get(k, 0) + v
+    walls = [t.get("wall_ms", 0.0) for t in sessions]
+    steps = sum(t.get("steps", 0) for t in sessions)
+    phase_total = sum(timings.values()) or 1.0
+    return {
+        "personas": len(sessions),
+        "steps": steps,
+        "session_wall_ms": {"p50": _percentile(walls, 50), "p95": _percentile(walls, 95), "max": max(walls or [0.0])},
+        "timings_ms": timings,
+        "timings_share": {k: round(v / phase_total, 3) for k, v in timings.items()},
+        "bytes": sizes,
+        "tokens": tokens,
+        "counters": counters,
+    }
@@ -1,10 +1,19 @@
 # utils.py
 from __future__ import annotations
 import os
-from typing import Any, Dict, Optional, List
-from pymongo import MongoClient
+import asyncio
+import weakref
+from typing import Any, AsyncIterator, Dict, Optional, List
+import httpx
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.collection import Collection
 from google import genai
+from google.genai import types as genai_types
+
+# Async Gemini transport: connections kept alive per client, calls capped per event loop.
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "20"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
 
 
 class MongoDBClient:
@@ -13,7 +22,7 @@ class MongoDBClient:
     """
 
     def __init__(self, uri: Optional[str] = None, default_db_name: Optional[str] = None):
-        self.uri = uri
+        self.uri = uri or os.getenv("MONGODB_URI")
         self.default_db_name = default_db_name or os.getenv("MONGODB_DB_NAME")
         if not self.uri:
             raise ValueError("MongoDB URI is missing. Set MONGODB_URI environment variable.")
@@ -37,8 +46,9 @@ class MongoDBClient:
     def find(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         return list(self.get_collection(db_name, collection).find(query or {}))
 
-    def find_one(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
-        return self.get_collection(db_name, collection).find_one(query or {})
+    def find_one(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None,
+                 projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return self.get_collection(db_name, collection).find_one(query or {}, projection)
 
     def update_one(self, db_name: Optional[str], collection: str, query: Dict[str, Any], update: Dict[str, Any]) -> Any:
         return self.get_collection(db_name, collection).update_one(query, update)
@@ -58,6 +68,114 @@ def get_mongo_client() -> MongoDBClient:
     return _mongo_instance
 
 
+def _keyset_filter(query: Optional[Dict[str, Any]], after_id: Any) -> Dict[str, Any]:
+    filt = dict(query or {})
+    if after_id is None:
+        return filt
+    return {"$and": [filt, {"_id": {"$gt": after_id}}]} if filt else {"_id": {"$gt": after_id}}
+
+
+class AsyncMongoDBClient:
+    """
+    Same routing API as MongoDBClient, on pymongo's native asyncio driver.
+    Every I/O method is a coroutine; the client is bound to the event loop
+    it is first used on, so get one per loop via get_async_mongo_client().
+    """
+
+    def __init__(self, uri: Optional[str] = None, default_db_name: Optional[str] = None):
+        self.uri = uri or os.getenv("MONGODB_URI")
+        self.default_db_name = default_db_name or os.getenv("MONGODB_DB_NAME")
+        if not self.uri:
+            raise ValueError("MongoDB URI is missing. Set MONGODB_URI environment variable.")
+        self.client = AsyncMongoClient(self.uri)
+
+    def get_db(self, db_name: Optional[str]) -> Any:
+        name = db_name or self.default_db_name
+        if not name:
+            raise ValueError("Database name not provided and no default is configured.")
+        return self.client[name]
+
+    def get_collection(self, db_name: Optional[str], coll_name: str) -> AsyncCollection:
+        if not coll_name:
+            raise ValueError("Collection name is required.")
+        return self.get_db(db_name)[coll_name]
+
+    async def insert_one(self, db_name: Optional[str], collection: str, document: Dict[str, Any]) -> Any:
+        return await self.get_collection(db_name, collection).insert_one(document)
+
+    async def insert_many(self, db_name: Optional[str], collection: str, documents: List[Dict[str, Any]], ordered: bool = True) -> Any:
+        return await self.get_collection(db_name, collection).insert_many(documents, ordered=ordered)
+
+    async def find(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return await self.get_collection(db_name, collection).find(query or {}).to_list(None)
+
+    async def iter_find(
+        self,
+        db_name: Optional[str],
+        collection: str,
+        query: Dict[str, Any] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 100,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streams matching documents through a server cursor, `batch_size` at a time."""
+        cursor = self.get_collection(db_name, collection).find(query or {}, projection, batch_size=batch_size)
+        try:
+            async for doc in cursor:
+                yield doc
+        finally:
+            await cursor.close()
+
+    async def find_page(
+        self,
+        db_name: Optional[str],
+        collection: str,
+        query: Dict[str, Any] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        after_id: Any = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """
+        One page in _id order, starting after `after_id` (keyset pagination).
+        Pass the last document's _id back in to get the next page.
+        """
+        cursor = (
+            self.get_collection(db_name, collection)
+            .find(_keyset_filter(query, after_id), projection, batch_size=limit)
+            .sort("_id", 1)
+            .limit(limit)
+        )
+        return await cursor.to_list(None)
+
+    async def find_one(self, db_name: Optional[str], collection: str, query: Dict[str, Any] = None,
+                       projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return await self.get_collection(db_name, collection).find_one(query or {}, projection)
+
+    async def update_one(self, db_name: Optional[str], collection: str, query: Dict[str, Any], update: Dict[str, Any]) -> Any:
+        return await self.get_collection(db_name, collection).update_one(query, update)
+
+    async def delete_one(self, db_name: Optional[str], collection: str, query: Dict[str, Any]) -> Any:
+        return await self.get_collection(db_name, collection).delete_one(query)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+# Async Mongo clients belong to the loop that first used them, like the Gemini clients below.
+_async_mongo_instances: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncMongoDBClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_mongo_client() -> AsyncMongoDBClient:
+    """Lazy AsyncMongoDBClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_mongo_instances.get(loop)
+    if client is None:
+        client = AsyncMongoDBClient()
+        _async_mongo_instances[loop] = client
+    return client
+
+
 def get_gemini_client(
     use_vertex: bool,
     project_id: Optional[str] = None,
@@ -83,3 +201,51 @@ def get_gemini_client(
         ):
             os.environ.pop(var, None)
         return genai.Client(api_key=key)
+
+
+# Async clients and their httpx pools belong to the event loop that created them,
+# so the cache is per loop, then per API key.
+_async_gemini_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, genai.Client]]" = (
+    weakref.WeakKeyDictionary()
+)
+_gemini_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_gemini_client(api_key: Optional[str] = None) -> genai.Client:
+    """
+    Cached API-key client for `client.aio` calls, sharing one pooled HTTP transport
+    per key. Must be called from a running event loop.
+    """
+    key = api_key or os.getenv("GOOGLE_API_KEY")
+    if not key:
+        raise ValueError("GOOGLE_API_KEY missing. Provide gemini_api_key in state or set env var.")
+
+    loop = asyncio.get_running_loop()
+    clients = _async_gemini_clients.setdefault(loop, {})
+    client = clients.get(key)
+    if client is None:
+        client = genai.Client(
+            api_key=key,
+            http_options=genai_types.HttpOptions(
+                async_client_args={
+                    "limits": httpx.Limits(
+                        max_connections=GEMINI_MAX_CONNECTIONS,
+                        max_keepalive_connections=GEMINI_MAX_CONNECTIONS,
+                    ),
+                },
+            ),
+        )
+        clients[key] = client
+    return client
+
+
+def gemini_semaphore() -> asyncio.Semaphore:
+    """Caps in-flight Gemini calls on the current loop at GEMINI_MAX_CONCURRENCY."""
+    loop = asyncio.get_running_loop()
+    sem = _gemini_semaphores.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+        _gemini_semaphores[loop] = sem
+    return sem
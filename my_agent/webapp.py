@@ -0,0 +1,22 @@
+# webapp.py
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from utils.browser_pool import close_browser_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Mounted next to the graph via langgraph.json "http.app". The browser pool is
+    shared by every run in the process, so it is closed with the server rather
+    than at the end of a job.
+    """
+    try:
+        yield
+    finally:
+        await close_browser_pool()
+
+
+app = FastAPI(lifespan=lifespan)
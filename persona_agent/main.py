@@ -1,12 +1,14 @@
+import asyncio
+import os
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
 import uvicorn
 from fastapi import FastAPI, HTTPException
-from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 from pydantic import BaseModel
 
 # Allow running the module directly (e.g., `uvicorn main:app`) without setting PYTHONPATH.
@@ -16,7 +18,19 @@ if _here.name == "persona_agent" and str(_package_parent) not in sys.path:
     sys.path.insert(0, str(_package_parent))
 
 from persona_agent.utils.state import AgentState
-from persona_agent.utils.nodes import generate_persona, write_persona, check_status
+from persona_agent.utils.nodes import (
+    reuse_personas,
+    generate_persona,
+    generate_personas,
+    dedup_persona,
+    write_persona,
+    check_status,
+    close_http_clients,
+)
+from persona_agent.utils.checkpoint import BoundedMemorySaver, open_checkpointer
+from persona_agent.utils.dedup import drop_dedup_index
+from persona_agent.utils.jobs import Job, get_job_registry
+from persona_agent.utils.utils import close_mongo_clients, shared_async_mongo_client
 
 
 builder = StateGraph(AgentState)
@@ -25,10 +39,38 @@ builder = StateGraph(AgentState)
 builder.add_node("generate_persona", generate_persona)
 builder.add_node("write_persona", write_persona)
 builder.add_node("check_status", check_status)
+builder.add_node("generate_personas", generate_personas)
+builder.add_node("reuse_personas", reuse_personas)
+builder.add_node("dedup_persona", dedup_persona)
+
+
+def _generation_mode(state: AgentState) -> str:
+    """One persona per loop iteration by default; all at once when concurrency or batch_size > 1."""
+    if (state.get("concurrency") or 1) > 1 or (state.get("batch_size") or 1) > 1:
+        return "generate_personas"
+    return "generate_persona"
+
+
+def _after_reuse(state: AgentState) -> str:
+    """Done when the cache covered the whole request, else generate the shortfall."""
+    if state.get("generated_count", 0) >= state.get("number", 0):
+        return END
+    return _generation_mode(state)
+
 
 # Edges
-builder.add_edge(START, "generate_persona")
-builder.add_edge("generate_persona", "write_persona")
+builder.add_edge(START, "reuse_personas")
+builder.add_conditional_edges("reuse_personas", _after_reuse, ["generate_persona", "generate_personas", END])
+builder.add_edge("generate_personas", END)
+builder.add_edge("generate_persona", "dedup_persona")
+
+
+def _after_dedup(state: AgentState) -> str:
+    """A rejected near-duplicate leaves no current_persona and is generated again."""
+    return "write_persona" if state.get("current_persona") else "generate_persona"
+
+
+builder.add_conditional_edges("dedup_persona", _after_dedup, ["write_persona", "generate_persona"])
 builder.add_edge("write_persona", "check_status")
 
 
@@ -46,12 +88,35 @@ builder.add_conditional_edges(
 )
 
 
-graph = builder.compile(checkpointer=MemorySaver())
+# Importers get the bounded in-memory checkpointer; the app recompiles with
+# PERSONA_CHECKPOINTER (memory / sqlite / none) in its lifespan.
+graph = builder.compile(checkpointer=BoundedMemorySaver())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens the checkpointer and the shared Mongo pool up front; on shutdown cancels
+    running jobs and closes every pooled client.
+    """
+    global graph
+    uri = os.getenv("MONGODB_URI")
+    if uri:
+        shared_async_mongo_client(uri)
+    async with open_checkpointer() as checkpointer:
+        graph = builder.compile(checkpointer=checkpointer)
+        try:
+            yield
+        finally:
+            await get_job_registry().cancel_all()
+            await close_http_clients()
+            await close_mongo_clients()
 
 
 fastapi_app = FastAPI(
     title="Persona Agent",
     description="Serve the persona generation LangGraph as a FastAPI endpoint.",
+    lifespan=lifespan,
 )
 
 
@@ -63,24 +128,114 @@ class PersonaRequest(BaseModel):
     number: int = 1
     collection_name: str = "Persona"
     DB_name: Optional[str] = None
-
-
-@fastapi_app.post("/invoke")
+    concurrency: int = 1
+    batch_size: int = 1
+    fresh: bool = False                  # bypass the persona cache for this request
+    state_mode: str = "full"             # "refs" keeps checkpoints small; personas come back via /jobs/{id}/result
+    resume: bool = False                 # continue the interrupted run from its last checkpoint; otherwise start a new run (per-run fields reset)
+
+
+# Per-run fields. A new (non-resume) run on an existing thread_id is merged into
+# the thread's last checkpoint, so these are reset rather than inherited.
+RUN_STATE_RESET = {
+    "status": "pending",
+    "generated_count": 0,
+    "reused_count": 0,
+    "dedup_retries": 0,
+    "dedup_rejected": 0,
+    "persona": [],
+    "current_persona": None,
+}
+
+
+async def _run_job(job: Job, initial_state: Optional[dict], config: dict) -> None:
+    """Streams the graph run into `job`: custom events carry persisted personas, values the latest state."""
+    job.set_status("running")
+    try:
+        async for mode, chunk in graph.astream(initial_state, config, stream_mode=["custom", "values"]):
+            if mode == "custom" and chunk.get("event") == "persona_persisted":
+                job.add_persona(chunk["persona"])
+            elif mode == "values":
+                job.result = chunk
+    except asyncio.CancelledError:
+        job.set_status("cancelled")
+        raise
+    except Exception as exc:
+        job.set_status("failed", error=str(exc))
+    else:
+        job.set_status("completed")
+    finally:
+        # check_status only drops it on completion; a resumed run reseeds it from state
+        drop_dedup_index(job.thread_id)
+
+
+def _get_job(job_id: str) -> Job:
+    job = get_job_registry().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@fastapi_app.post("/invoke", status_code=202)
 async def invoke_graph(payload: PersonaRequest):
     """
-    Invoke the LangGraph persona agent.
+    Starts the LangGraph persona agent in the background and returns its job id.
+    Poll /jobs/{job_id}, fetch /jobs/{job_id}/result, or follow /jobs/{job_id}/events.
+    409 while another job is still running on the same thread_id: both would
+    write the same checkpoint thread and dedup index.
     """
+    registry = get_job_registry()
+    running = registry.active_for(payload.thread_id)
+    if running is not None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job {running.id} is still {running.status} on thread {payload.thread_id}.",
+        )
+
     config = {"configurable": {"thread_id": payload.thread_id}}
-    initial_state = payload.model_dump(exclude={"thread_id"})
+    initial_state = None
+    if not payload.resume:
+        initial_state = {**RUN_STATE_RESET, **payload.model_dump(exclude={"thread_id", "resume"})}
 
-    try:
-        result = await run_in_threadpool(graph.invoke, initial_state, config)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    except Exception as exc:  # pragma: no cover - safeguard for unexpected errors
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    job = registry.create(payload.thread_id, payload.number)
+    job.task = asyncio.create_task(_run_job(job, initial_state, config))
+    return job.summary()
+
+
+@fastapi_app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    return _get_job(job_id).summary()
 
-    return {"thread_id": payload.thread_id, "result": result}
+
+@fastapi_app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """
+    Final state of a finished job. Failed and cancelled jobs are reported in the
+    payload (status, error) with whatever state and personas they reached;
+    409 only while the job is still pending or running.
+    """
+    job = _get_job(job_id)
+    if not job.done:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}.")
+    return {
+        "job_id": job.id,
+        "thread_id": job.thread_id,
+        "status": job.status,
+        "error": job.error,
+        "result": job.result,
+        "personas": job.personas,
+    }
+
+
+@fastapi_app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: one "persona" event per persisted persona, then a final "status" event."""
+    job = _get_job(job_id)
+    return StreamingResponse(
+        job.events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 app = fastapi_app
@@ -1,3 +1,15 @@
-from .utils import MongoDBClient, get_mongo_client
+from .utils import (
+    MongoDBClient,
+    AsyncMongoDBClient,
+    get_mongo_client,
+    get_async_mongo_client,
+    close_mongo_clients,
+)
 
-__all__ = ["MongoDBClient", "get_mongo_client"]
+__all__ = [
+    "MongoDBClient",
+    "AsyncMongoDBClient",
+    "get_mongo_client",
+    "get_async_mongo_client",
+    "close_mongo_clients",
+]
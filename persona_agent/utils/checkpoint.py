@@ -0,0 +1,193 @@
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+try:
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+except ImportError:  # optional: pip install langgraph-checkpoint-sqlite
+    aiosqlite = None
+    AsyncSqliteSaver = None
+
+# "memory" (bounded, in process), "sqlite" (on disk, survives restarts) or "none".
+CHECKPOINTER = os.getenv("PERSONA_CHECKPOINTER", "memory")
+CHECKPOINT_PATH = os.getenv("PERSONA_CHECKPOINT_PATH", "persona_checkpoints.sqlite")
+CHECKPOINT_MAX_THREADS = int(os.getenv("PERSONA_CHECKPOINT_MAX_THREADS", "500"))
+CHECKPOINT_TTL_S = int(os.getenv("PERSONA_CHECKPOINT_TTL_S", str(24 * 3600)))
+EVICT_INTERVAL_S = 60
+
+
+class ThreadEviction:
+    """
+    Tracks when each thread last wrote a checkpoint and says which threads to
+    drop: anything idle longer than `ttl_s`, then the least recently used
+    beyond `max_threads`.
+    """
+
+    def __init__(self, max_threads: int = CHECKPOINT_MAX_THREADS, ttl_s: int = CHECKPOINT_TTL_S):
+        self.max_threads = max_threads
+        self.ttl_s = ttl_s
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+
+    def touch(self, thread_id: str) -> None:
+        self._last_used[thread_id] = time.time()
+        self._last_used.move_to_end(thread_id)
+
+    def forget(self, thread_id: str) -> None:
+        self._last_used.pop(thread_id, None)
+
+    def expired(self, keep: Optional[str] = None) -> List[str]:
+        cutoff = time.time() - self.ttl_s
+        victims: List[str] = []
+        excess = len(self._last_used) - self.max_threads
+        for thread_id, last_used in self._last_used.items():
+            if thread_id == keep:
+                continue
+            if excess > 0 or last_used < cutoff:
+                victims.append(thread_id)
+                excess -= 1
+            else:
+                break
+        for thread_id in victims:
+            self.forget(thread_id)
+        return victims
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    InMemorySaver that keeps only the latest checkpoint of each thread (plus its
+    pending writes and the channel blobs it references) and evicts whole threads
+    by TTL / LRU, so memory stays flat under sustained traffic.
+    """
+
+    def __init__(self, *, max_threads: int = CHECKPOINT_MAX_THREADS, ttl_s: int = CHECKPOINT_TTL_S,
+                 prune_intermediate: bool = True, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.eviction = ThreadEviction(max_threads, ttl_s)
+        self.prune_intermediate = prune_intermediate
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        conf = next_config["configurable"]
+        thread_id, ns = conf["thread_id"], conf.get("checkpoint_ns", "")
+        if self.prune_intermediate:
+            self._prune(thread_id, ns, conf["checkpoint_id"], checkpoint.get("channel_versions", {}))
+        self.eviction.touch(thread_id)
+        for victim in self.eviction.expired(keep=thread_id):
+            self.delete_thread(victim)
+        return next_config
+
+    def _prune(self, thread_id: str, ns: str, keep_id: str, channel_versions: Dict[str, Any]) -> None:
+        checkpoints = self.storage[thread_id][ns]
+        for checkpoint_id in [c for c in checkpoints if c != keep_id]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, ns, checkpoint_id), None)
+        referenced = {(thread_id, ns, ch, v) for ch, v in channel_versions.items()}
+        for key in [k for k in self.blobs if k[0] == thread_id and k[1] == ns and k not in referenced]:
+            del self.blobs[key]
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self.eviction.forget(thread_id)
+
+
+_ACTIVITY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS thread_activity (
+    thread_id TEXT PRIMARY KEY,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS thread_activity_last_used ON thread_activity(last_used);
+"""
+
+
+if AsyncSqliteSaver is not None:
+
+    class BoundedSqliteSaver(AsyncSqliteSaver):
+        """
+        AsyncSqliteSaver with the same bounds as BoundedMemorySaver: intermediate
+        checkpoints of a thread are deleted as new ones land, and threads idle
+        past the TTL or beyond max_threads (least recently used first) are
+        dropped. Thread activity lives in its own table, so the bounds hold
+        across restarts too.
+        """
+
+        def __init__(self, conn, *, max_threads: int = CHECKPOINT_MAX_THREADS, ttl_s: int = CHECKPOINT_TTL_S,
+                     prune_intermediate: bool = True, **kwargs: Any):
+            super().__init__(conn, **kwargs)
+            self.max_threads = max_threads
+            self.ttl_s = ttl_s
+            self.prune_intermediate = prune_intermediate
+            self._last_evict = 0.0
+
+        async def setup(self) -> None:
+            if self.is_setup:
+                return
+            await super().setup()
+            async with self.lock:
+                await self.conn.executescript(_ACTIVITY_SCHEMA)
+                await self.conn.commit()
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            next_config = await super().aput(config, checkpoint, metadata, new_versions)
+            conf = next_config["configurable"]
+            thread_id, ns, keep_id = conf["thread_id"], conf.get("checkpoint_ns", ""), conf["checkpoint_id"]
+            async with self.lock:
+                if self.prune_intermediate:
+                    for table in ("checkpoints", "writes"):
+                        await self.conn.execute(
+                            f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id != ?",
+                            (thread_id, ns, keep_id),
+                        )
+                await self.conn.execute(
+                    "INSERT INTO thread_activity(thread_id, last_used) VALUES (?, ?) "
+                    "ON CONFLICT(thread_id) DO UPDATE SET last_used = excluded.last_used",
+                    (thread_id, time.time()),
+                )
+                if time.monotonic() - self._last_evict >= EVICT_INTERVAL_S:
+                    self._last_evict = time.monotonic()
+                    await self._evict(keep=thread_id)
+                await self.conn.commit()
+            return next_config
+
+        async def _evict(self, keep: str) -> None:
+            async with self.conn.execute(
+                "SELECT thread_id FROM thread_activity WHERE thread_id != ? AND ("
+                "  last_used < ? OR thread_id NOT IN ("
+                "    SELECT thread_id FROM thread_activity ORDER BY last_used DESC LIMIT ?))",
+                (keep, time.time() - self.ttl_s, self.max_threads),
+            ) as cur:
+                victims = [row[0] async for row in cur]
+            for thread_id in victims:
+                for table in ("checkpoints", "writes", "thread_activity"):
+                    await self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+else:
+    BoundedSqliteSaver = None
+
+
+@asynccontextmanager
+async def open_checkpointer(kind: str = CHECKPOINTER, path: str = CHECKPOINT_PATH) -> AsyncIterator[Optional[BaseCheckpointSaver]]:
+    """
+    Yields the configured checkpointer for the lifetime of the app:
+      - "memory": BoundedMemorySaver
+      - "sqlite": BoundedSqliteSaver on `path` (needs langgraph-checkpoint-sqlite)
+      - "none":   no checkpointer
+    """
+    if kind == "none":
+        yield None
+    elif kind == "memory":
+        yield BoundedMemorySaver()
+    elif kind == "sqlite":
+        if BoundedSqliteSaver is None:
+            raise RuntimeError("PERSONA_CHECKPOINTER=sqlite requires langgraph-checkpoint-sqlite (and aiosqlite).")
+        async with aiosqlite.connect(path) as conn:
+            saver = BoundedSqliteSaver(conn)
+            await saver.setup()
+            yield saver
+    else:
+        raise ValueError(f"Unknown checkpointer: {kind!r} (expected memory, sqlite or none).")
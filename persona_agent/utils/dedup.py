@@ -0,0 +1,127 @@
+import hashlib
+import os
+import re
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Estimated Jaccard similarity (word 3-gram shingles) at or above which a persona
+# counts as a near-duplicate of one already generated in the thread.
+DEDUP_THRESHOLD = float(os.getenv("PERSONA_DEDUP_THRESHOLD", "0.5"))
+NUM_PERM = 64
+BANDS = 32                    # LSH bands of 2 rows: ~99.99% recall at the default threshold
+SHINGLE_SIZE = 3
+DEDUP_MAX_THREADS = int(os.getenv("PERSONA_DEDUP_MAX_THREADS", "256"))  # indexes held in process
+
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def _permutations(n: int) -> List[Tuple[int, int]]:
+    # Fixed seeds so signatures are comparable across processes.
+    out = []
+    for i in range(n):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little") % _MERSENNE or 1
+        b = int.from_bytes(digest[8:], "little") % _MERSENNE
+        out.append((a, b))
+    return out
+
+
+_PERMS = _permutations(NUM_PERM)
+
+
+def persona_text(persona: Dict[str, Any]) -> str:
+    """What two personas are compared on: the profile, not the (easily varied) name."""
+    return f"{persona.get('occupation') or ''} {persona.get('bio') or ''}"
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    tokens = _TOKEN.findall(text.casefold())
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    hashed = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        for s in shingles(text)
+    ]
+    if not hashed:
+        return (_MAX_HASH,) * NUM_PERM
+    return tuple(min(((a * h + b) % _MERSENNE) & _MAX_HASH for h in hashed) for a, b in _PERMS)
+
+
+def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+class DedupIndex:
+    """
+    MinHash signatures of the personas accepted so far, with LSH banding so a
+    new persona is only compared against plausible matches.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._signatures: List[Tuple[int, ...]] = []
+        self._bands: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        self._rows = NUM_PERM // BANDS
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, sig: Tuple[int, ...]) -> Iterable[Tuple[int, Tuple[int, ...]]]:
+        for band in range(BANDS):
+            yield band, sig[band * self._rows : (band + 1) * self._rows]
+
+    def add(self, persona: Dict[str, Any]) -> None:
+        self._add(minhash(persona_text(persona)))
+
+    def _add(self, sig: Tuple[int, ...]) -> None:
+        idx = len(self._signatures)
+        self._signatures.append(sig)
+        for key in self._band_keys(sig):
+            self._bands[key].append(idx)
+
+    def _best_match(self, sig: Tuple[int, ...]) -> float:
+        candidates = {i for key in self._band_keys(sig) for i in self._bands.get(key, ())}
+        return max((similarity(sig, self._signatures[i]) for i in candidates), default=0.0)
+
+    def duplicate_score(self, persona: Dict[str, Any]) -> Optional[float]:
+        """Similarity to the closest accepted persona if it reaches the threshold, else None."""
+        score = self._best_match(minhash(persona_text(persona)))
+        return score if score >= self.threshold else None
+
+    def admit(self, persona: Dict[str, Any]) -> bool:
+        """Adds the persona unless it near-duplicates one already accepted."""
+        sig = minhash(persona_text(persona))
+        if self._best_match(sig) >= self.threshold:
+            return False
+        self._add(sig)
+        return True
+
+
+# One index per graph thread, seeded from the thread's stored personas when first used.
+# Bounded LRU: an evicted index is simply reseeded on the thread's next use.
+_indexes: "OrderedDict[str, DedupIndex]" = OrderedDict()
+
+
+def get_dedup_index(thread_id: str, seed: Iterable[Dict[str, Any]] = ()) -> DedupIndex:
+    index = _indexes.get(thread_id)
+    if index is None:
+        index = DedupIndex()
+        for persona in seed:
+            index.add(persona)
+        _indexes[thread_id] = index
+        while len(_indexes) > DEDUP_MAX_THREADS:
+            _indexes.popitem(last=False)
+    else:
+        _indexes.move_to_end(thread_id)
+    return index
+
+
+def drop_dedup_index(thread_id: str) -> None:
+    _indexes.pop(thread_id, None)
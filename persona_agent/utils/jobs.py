@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from uuid import uuid4
+
+# Finished jobs are kept this long for /jobs/{id} polling, then dropped.
+JOB_RETENTION_S = int(os.getenv("PERSONA_JOB_RETENTION_S", "3600"))
+SSE_KEEPALIVE_S = 15
+
+_TERMINAL = {"completed", "failed", "cancelled"}
+
+
+@dataclass
+class Job:
+    id: str
+    thread_id: str
+    number: int
+    status: str = "pending"                                  # pending | running | completed | failed | cancelled
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    personas: List[Dict[str, Any]] = field(default_factory=list)   # persisted so far, in arrival order
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = None
+    _subscribers: Set[asyncio.Queue] = field(default_factory=set)
+
+    @property
+    def done(self) -> bool:
+        return self.status in _TERMINAL
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "thread_id": self.thread_id,
+            "status": self.status,
+            "number": self.number,
+            "persisted": len(self.personas),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "error": self.error,
+        }
+
+    # --- progress ---
+
+    def _publish(self, event: str, data: Dict[str, Any]) -> None:
+        self.updated_at = time.time()
+        for queue in self._subscribers:
+            queue.put_nowait((event, data))
+
+    def add_persona(self, persona: Dict[str, Any]) -> None:
+        self.personas.append(persona)
+        self._publish("persona", persona)
+
+    def set_status(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self._publish("status", self.summary())
+
+    async def events(self) -> AsyncIterator[str]:
+        """
+        Server-sent events: every persona persisted so far, then new ones as they
+        arrive, then a final "status" event once the job is finished.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        backlog = list(self.personas)
+        finished = self.done
+        self._subscribers.add(queue)
+        try:
+            for persona in backlog:
+                yield _sse("persona", persona)
+            if finished:
+                yield _sse("status", self.summary())
+                return
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event, data)
+                if event == "status" and data.get("status") in _TERMINAL:
+                    return
+        finally:
+            self._subscribers.discard(queue)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class JobRegistry:
+    """In-process registry of persona generation jobs, keyed by job id."""
+
+    def __init__(self, retention_s: int = JOB_RETENTION_S):
+        self.retention_s = retention_s
+        self._jobs: Dict[str, Job] = {}
+
+    def create(self, thread_id: str, number: int) -> Job:
+        self.prune()
+        job = Job(id=uuid4().hex, thread_id=thread_id, number=number)
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def active_for(self, thread_id: str) -> Optional[Job]:
+        """The unfinished job running on `thread_id`, if any."""
+        return next((j for j in self._jobs.values() if j.thread_id == thread_id and not j.done), None)
+
+    def prune(self) -> None:
+        cutoff = time.time() - self.retention_s
+        for job_id in [j.id for j in self._jobs.values() if j.done and j.updated_at < cutoff]:
+            del self._jobs[job_id]
+
+    async def cancel_all(self) -> None:
+        tasks = [j.task for j in self._jobs.values() if j.task and not j.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_registry: Optional[JobRegistry] = None
+
+
+def get_job_registry() -> JobRegistry:
+    global _registry
+    if _registry is None:
+        _registry = JobRegistry()
+    return _registry
@@ -1,17 +1,39 @@
 import json
 import os
+import asyncio
+import weakref
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-import requests
+import httpx
+from langgraph.config import get_config, get_stream_writer
+from pymongo.errors import PyMongoError
 
+from .dedup import DedupIndex, drop_dedup_index, get_dedup_index
+from .persona_cache import context_key, get_persona_cache
 from .schema import Persona
 from .state import AgentState
-from .utils import MongoDBClient
+from .utils import get_async_mongo_client
 
 AIML_ENDPOINT = "https://api.aimlapi.com/v1/chat/completions"
 AIML_MODEL = "openai/gpt-4.1-mini-2025-04-14"
+AIML_TIMEOUT_S = 60
+
+# Pooled transport per event loop; in-flight AIML calls capped per loop.
+AIML_MAX_CONNECTIONS = int(os.getenv("AIML_MAX_CONNECTIONS", "20"))
+AIML_MAX_CONCURRENCY = int(os.getenv("AIML_MAX_CONCURRENCY", "8"))
+MAX_BATCH_SIZE = 10               # personas requested per call in batch mode
+MAX_GENERATION_ROUNDS = 3         # retries for personas lost to failed / invalid / duplicate responses
+MAX_DEDUP_RETRIES = 3             # sequential mode: regenerations before a near-duplicate is accepted
+BASE_TEMPERATURE = 0.2
+
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_aiml_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 def _get_api_key() -> str:
@@ -24,7 +46,65 @@ def _get_api_key() -> str:
     return api_key
 
 
-def _build_messages(title: str, description: str, target_audience: str) -> List[Dict[str, str]]:
+def _aiml_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=AIML_TIMEOUT_S,
+            limits=httpx.Limits(
+                max_connections=AIML_MAX_CONNECTIONS,
+                max_keepalive_connections=AIML_MAX_CONNECTIONS,
+            ),
+        )
+        _http_clients[loop] = client
+    return client
+
+
+def _aiml_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _aiml_semaphores.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(AIML_MAX_CONCURRENCY)
+        _aiml_semaphores[loop] = sem
+    return sem
+
+
+async def close_http_clients() -> None:
+    """Closes the pooled AIML client of the running loop; call once on shutdown."""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+_BATCH_PROMPT = """
+You are an expert persona designer specializing in constructing authentic, research-driven user personas.
+
+Using the provided product context and target audience, generate {count} realistic, clearly distinct personas
+(vary age, gender, occupation, background and motivation).
+Your response must be a valid JSON array of {count} objects, each adhering strictly to the following schema:
+
+{{
+  "name": "string",
+  "age": integer,
+  "gender": "string",
+  "occupation": "string",
+  "bio": "string"
+}}
+
+Requirements:
+- Every persona must be credible, demographically plausible, and aligned with the given context.
+- Each bio must be detailed, human-sounding, and clearly reflect the persona’s background, motivations, goals, and connection to the product or domain.
+- Do not include any text outside the JSON array.
+- Ensure the JSON is syntactically valid and every object conforms exactly to the schema (no extra fields).
+
+Generate the personas now."""
+
+
+def _build_messages(title: str, description: str, target_audience: str, count: int = 1) -> List[Dict[str, str]]:
+    if count > 1:
+        return _with_context(_BATCH_PROMPT.format(count=count), title, description, target_audience)
+
     prompt = ("""
         You are an expert persona designer specializing in constructing authentic, research-driven user personas.
 
@@ -48,6 +128,10 @@ Requirements:
 Generate the persona now."""
     )
 
+    return _with_context(prompt, title, description, target_audience)
+
+
+def _with_context(prompt: str, title: str, description: str, target_audience: str) -> List[Dict[str, str]]:
     user_context = (
         f"Title: {title or 'N/A'}\n"
         f"Description: {description or 'N/A'}\n"
@@ -74,33 +158,148 @@ def _parse_persona_payload(raw_content: str) -> Dict[str, Any]:
         raise ValueError("Failed to parse persona JSON from model response.")
 
 
+def _parse_persona_batch(raw_content: str) -> List[Dict[str, Any]]:
+    try:
+        data = json.loads(raw_content)
+    except json.JSONDecodeError:
+        start = raw_content.find("[")
+        end = raw_content.rfind("]")
+        if start == -1 or end == -1 or start >= end:
+            raise ValueError("Failed to parse persona JSON array from model response.")
+        data = json.loads(raw_content[start : end + 1])
+    if isinstance(data, dict):
+        # Some models wrap the array: {"personas": [...]}
+        data = next((v for v in data.values() if isinstance(v, list)), [data])
+    return [d for d in data if isinstance(d, dict)]
+
+
+def _validate_persona(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Returns the persona reduced to the schema fields, or None when it is unusable
+    (missing name, non-numeric age).
+    """
+    name = data.get("name")
+    if not isinstance(name, str) or not name.strip():
+        return None
+    age = data.get("age")
+    if age is not None:
+        try:
+            age = int(age)
+        except (TypeError, ValueError):
+            return None
+    persona = {"name": name.strip(), "age": age}
+    for key in ("gender", "occupation", "bio"):
+        value = data.get(key)
+        persona[key] = str(value).strip() if value is not None else None
+    if data.get("id"):
+        persona["id"] = data["id"]
+    return persona
+
+
 def _timestamp() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def generate_persona(state: AgentState) -> Dict[str, Any]:
-    api_key = _get_api_key()
+def _stamp(persona_data: Dict[str, Any]) -> Dict[str, Any]:
+    persona_data["id"] = persona_data.get("id") or str(uuid4())
+    now = _timestamp()
+    persona_data["created_at"] = now
+    persona_data["updated_at"] = now
+    return persona_data
 
-    title = state.get("title", "")
-    description = state.get("description", "")
-    target_audience = state.get("target_audience", "")
 
-    if not target_audience:
-        raise ValueError("target_audience is required to generate a persona.")
+def _persona_record(current: Dict[str, Any]) -> Dict[str, Any]:
+    return {**Persona(
+        id=current.get("id"),
+        name=current.get("name", ""),
+        age=current.get("age"),
+        gender=current.get("gender"),
+        occupation=current.get("occupation"),
+        bio=current.get("bio"),
+        created_at=current.get("created_at"),
+        updated_at=current.get("updated_at"),
+    ).__dict__}
 
-    response = requests.post(
-        AIML_ENDPOINT,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        json={
-            "model": AIML_MODEL,
-            "messages": _build_messages(title, description, target_audience),
-            "temperature": 0.2,
-        },
-        timeout=60,
-    )
+
+def _refs_only(state: AgentState) -> bool:
+    """state_mode "refs": stored personas stay in Mongo; state keeps a reference to the latest only."""
+    return state.get("state_mode") == "refs"
+
+
+def _persona_ref(stored: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": stored.get("id"), "_id": stored.get("_id")}
+
+
+def _emit_persisted(personas: List[Dict[str, Any]]) -> None:
+    """Reports stored personas on the "custom" stream (no-op unless the caller streams it)."""
+    writer = get_stream_writer()
+    for persona in personas:
+        writer({"event": "persona_persisted", "persona": persona})
+
+
+def _thread_id() -> str:
+    return str(get_config().get("configurable", {}).get("thread_id") or "default")
+
+
+def _dedup_index(state: AgentState, pending: Optional[Dict[str, Any]] = None) -> DedupIndex:
+    """
+    The thread's near-duplicate index, seeded from the personas already in state
+    (minus `pending`, the not-yet-checked persona generate_persona appended).
+    """
+    seed = [p for p in state.get("persona") or [] if p != pending]
+    return get_dedup_index(_thread_id(), seed=seed)
+
+
+def _admit_unique(state: AgentState, personas: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """Up to `limit` of `personas` that near-duplicate neither each other nor the thread's earlier ones."""
+    index = _dedup_index(state)
+    admitted: List[Dict[str, Any]] = []
+    for persona in personas:
+        if len(admitted) >= limit:
+            break
+        if index.admit(persona):
+            admitted.append(persona)
+    return admitted
+
+
+async def _store_personas(state: AgentState, mongo_client, personas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Inserts stamped personas into the request's collection and reports them; returns them with their _id."""
+    collection_name = state.get("collection_name") or "Persona"
+    result = await mongo_client.insert_many(collection_name, [_persona_record(p) for p in personas])
+    stored = [{**p, "_id": str(_id)} for p, _id in zip(personas, result.inserted_ids)]
+    _emit_persisted(stored)
+    return stored
+
+
+def _context_key(state: AgentState) -> str:
+    return context_key(state.get("title"), state.get("description"), state.get("target_audience"))
+
+
+async def _cache_generated(state: AgentState, mongo_client, personas: List[Dict[str, Any]]) -> None:
+    try:
+        await get_persona_cache().add(mongo_client, _context_key(state), personas)
+    except PyMongoError:
+        # the personas themselves are stored; a cache miss next time only costs a regeneration
+        pass
+
+
+async def _request_personas(title: str, description: str, target_audience: str, count: int = 1,
+                            temperature: float = BASE_TEMPERATURE) -> List[Dict[str, Any]]:
+    """One AIML call over the pooled client; returns the raw persona dicts (unvalidated)."""
+    api_key = _get_api_key()
+    async with _aiml_semaphore():
+        response = await _aiml_client().post(
+            AIML_ENDPOINT,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {api_key}",
+            },
+            json={
+                "model": AIML_MODEL,
+                "messages": _build_messages(title, description, target_audience, count),
+                "temperature": temperature,
+            },
+        )
     response.raise_for_status()
 
     payload = response.json()
@@ -109,19 +308,75 @@ def generate_persona(state: AgentState) -> Dict[str, Any]:
     except (KeyError, IndexError):
         raise ValueError(f"Unexpected response format from AIML API: {payload}")
 
-    persona_data = _parse_persona_payload(content)
+    if count > 1:
+        return _parse_persona_batch(content)
+    return [_parse_persona_payload(content)]
 
-    persona_id = persona_data.get("id") or str(uuid4())
-    persona_data["id"] = persona_id
 
-    now = _timestamp()
-    persona_data["created_at"] = now
-    persona_data["updated_at"] = now
+async def reuse_personas(state: AgentState) -> Dict[str, Any]:
+    """
+    Fills as much of the request as possible from personas previously generated
+    for the same product context (see persona_cache.py), writing them to the
+    request's collection under fresh ids. Generation then only covers the
+    shortfall. Skipped when state["fresh"] is set.
+    """
+    target = state.get("number", 0)
+    generated_count = state.get("generated_count", 0)
+    if target - generated_count <= 0:
+        return {"status": "completed"}
+    if state.get("fresh"):
+        return {}
 
-    personas = list(state.get("persona", []))
-    personas.append(persona_data)
+    mongo_client = get_async_mongo_client(db_name=state.get("DB_name"))
+    try:
+        cached = await get_persona_cache().get(mongo_client, _context_key(state), target - generated_count)
+    except PyMongoError:
+        return {}
+    valid = [p for p in map(_validate_persona, cached) if p]
+    reused = [_stamp(p) for p in _admit_unique(state, valid, target - generated_count)]
+    if not reused:
+        return {}
+
+    stored = await _store_personas(state, mongo_client, reused)
+    generated_count += len(stored)
+    update: Dict[str, Any] = {
+        "generated_count": generated_count,
+        "reused_count": len(stored),
+    }
+    if _refs_only(state):
+        update["current_persona"] = _persona_ref(stored[-1])
+    else:
+        update["persona"] = list(state.get("persona", [])) + stored
+        update["current_persona"] = stored[-1]
+    if generated_count >= target:
+        drop_dedup_index(_thread_id())
+        update["status"] = "completed"
+    return update
+
+
+async def generate_persona(state: AgentState) -> Dict[str, Any]:
+    title = state.get("title", "")
+    description = state.get("description", "")
+    target_audience = state.get("target_audience", "")
+
+    if not target_audience:
+        raise ValueError("target_audience is required to generate a persona.")
+
+    # a rejected near-duplicate is retried with more sampling freedom
+    retries = state.get("dedup_retries", 0)
+    temperature = min(1.0, BASE_TEMPERATURE + 0.2 * retries)
+    raw = (await _request_personas(title, description, target_audience, temperature=temperature))[0]
+    persona_data = _validate_persona(raw)
+    if persona_data is None:
+        raise ValueError(f"Model returned an invalid persona: {raw}")
+    _stamp(persona_data)
 
     generated_count = state.get("generated_count", 0) + 1
+    if _refs_only(state):
+        return {"current_persona": persona_data, "generated_count": generated_count}
+
+    personas = list(state.get("persona", []))
+    personas.append(persona_data)
 
     return {
         "current_persona": persona_data,
@@ -130,30 +385,126 @@ def generate_persona(state: AgentState) -> Dict[str, Any]:
     }
 
 
-def write_persona(state: AgentState) -> Dict[str, Any]:
+async def generate_personas(state: AgentState) -> Dict[str, Any]:
+    """
+    Concurrent mode: generates and stores all remaining personas in one node.
+    Up to `concurrency` AIML calls are in flight at once (further capped by
+    AIML_MAX_CONCURRENCY), each asking for `batch_size` personas. Every
+    response is validated and written to Mongo as soon as it arrives; personas
+    lost to failed or invalid responses are requested again, up to
+    MAX_GENERATION_ROUNDS rounds.
+    """
+    title = state.get("title", "")
+    description = state.get("description", "")
+    target_audience = state.get("target_audience", "")
+
+    if not target_audience:
+        raise ValueError("target_audience is required to generate a persona.")
+
+    mongo_client = get_async_mongo_client(db_name=state.get("DB_name"))
+    batch_size = max(1, min(int(state.get("batch_size") or 1), MAX_BATCH_SIZE))
+    limit = asyncio.Semaphore(max(1, int(state.get("concurrency") or 1)))
+
+    refs = _refs_only(state)
+    personas = list(state.get("persona", []))
+    latest: Optional[Dict[str, Any]] = personas[-1] if personas else None
+    generated_count = state.get("generated_count", 0)
+    remaining = state.get("number", 0) - generated_count
+    last_error: Optional[Exception] = None
+    rejected = 0
+
+    async def _call(count: int) -> List[Dict[str, Any]]:
+        async with limit:
+            return await _request_personas(title, description, target_audience, count)
+
+    for _ in range(MAX_GENERATION_ROUNDS):
+        if remaining <= 0:
+            break
+        sizes = [batch_size] * (remaining // batch_size)
+        if remaining % batch_size:
+            sizes.append(remaining % batch_size)
+
+        for arrival in asyncio.as_completed([_call(n) for n in sizes]):
+            try:
+                raw = await arrival
+            except (httpx.HTTPError, ValueError) as exc:
+                last_error = exc
+                continue
+
+            valid = [p for p in map(_validate_persona, raw) if p]
+            fresh = _admit_unique(state, valid, max(remaining, 0))
+            rejected += len(valid) - len(fresh)
+            if not fresh:
+                continue
+            for p in fresh:
+                _stamp(p)
+            stored = await _store_personas(state, mongo_client, fresh)
+            await _cache_generated(state, mongo_client, fresh)
+            latest = _persona_ref(stored[-1]) if refs else stored[-1]
+            if not refs:
+                personas.extend(stored)
+            generated_count += len(fresh)
+            remaining -= len(fresh)
+
+    drop_dedup_index(_thread_id())
+    if remaining > 0:
+        raise ValueError(
+            f"Generated {generated_count} of {state.get('number', 0)} personas "
+            f"({rejected} near-duplicates rejected); last error: {last_error}"
+        )
+
+    return {
+        "persona": personas,
+        "current_persona": latest,
+        "generated_count": generated_count,
+        "dedup_rejected": state.get("dedup_rejected", 0) + rejected,
+        "status": "completed",
+    }
+
+
+def dedup_persona(state: AgentState) -> Dict[str, Any]:
+    """
+    Sequential mode, between generate_persona and write_persona: rejects a
+    persona that near-duplicates one already generated in the thread (MinHash,
+    see dedup.py) by clearing current_persona and undoing its count, so the
+    graph regenerates it. After MAX_DEDUP_RETRIES rejections in a row the
+    persona is accepted rather than looping forever.
+    """
+    current = state.get("current_persona")
+    if not current:
+        return {}
+
+    index = _dedup_index(state, pending=current)
+    retries = state.get("dedup_retries", 0)
+    if index.duplicate_score(current) is None or retries >= MAX_DEDUP_RETRIES:
+        index.add(current)
+        return {"dedup_retries": 0}
+
+    update: Dict[str, Any] = {
+        "current_persona": None,
+        "generated_count": state.get("generated_count", 1) - 1,
+        "dedup_retries": retries + 1,
+        "dedup_rejected": state.get("dedup_rejected", 0) + 1,
+    }
+    if not _refs_only(state):
+        update["persona"] = list(state.get("persona", []))[:-1]
+    return update
+
+
+async def write_persona(state: AgentState) -> Dict[str, Any]:
     current = state.get("current_persona")
     if not current:
         raise ValueError("No persona available in state to persist.")
 
     collection_name = state.get("collection_name") or "Persona"
-    db_name = state.get("DB_name")
-    URI  = os.getenv("MONGODB_URI")
-    mongo_client = MongoDBClient(db_name=db_name , uri=os.getenv("MONGODB_URI")
-)
-    persona_record = Persona(
-        id=current.get("id"),
-        name=current.get("name", ""),
-        age=current.get("age"),
-        gender=current.get("gender"),
-        occupation=current.get("occupation"),
-        bio=current.get("bio"),
-        created_at=current.get("created_at"),
-        updated_at=current.get("updated_at"),
-    )
-
-    insert_result = mongo_client.insert_one(collection_name, {**persona_record.__dict__})
+    mongo_client = get_async_mongo_client(db_name=state.get("DB_name"))
+    insert_result = await mongo_client.insert_one(collection_name, _persona_record(current))
 
     stored_persona = {**current, "_id": str(insert_result.inserted_id)}
+    _emit_persisted([stored_persona])
+    await _cache_generated(state, mongo_client, [current])
+    if _refs_only(state):
+        return {"current_persona": _persona_ref(stored_persona)}
 
     personas = list(state.get("persona", []))
     if personas:
@@ -169,10 +520,8 @@ def check_status(state: AgentState) -> Dict[str, Any]:
     generated = state.get("generated_count", 0)
     target = state.get("number", 0)
 
-    if target <= 0:
-        return {"status": "completed"}
-
-    if generated >= target:
+    if target <= 0 or generated >= target:
+        drop_dedup_index(_thread_id())
         return {"status": "completed"}
 
     return {}
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .utils import AsyncMongoDBClient
+
+PERSONA_CACHE_COLLECTION = os.getenv("PERSONA_CACHE_COLLECTION", "PersonaCache")
+PERSONA_CACHE_MAX_KEYS = int(os.getenv("PERSONA_CACHE_MAX_KEYS", "256"))      # contexts held in process
+PERSONA_CACHE_MAX_PER_KEY = int(os.getenv("PERSONA_CACHE_MAX_PER_KEY", "200"))  # newest personas kept per context
+PERSONA_CACHE_TTL_S = int(os.getenv("PERSONA_CACHE_TTL_S", "600"))            # in-process entries only
+
+CACHED_FIELDS = ("name", "age", "gender", "occupation", "bio")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", (text or "").casefold()).strip()
+
+
+def context_key(title: Optional[str], description: Optional[str], target_audience: Optional[str]) -> str:
+    """Hash of the product context, insensitive to case and whitespace."""
+    payload = json.dumps([_normalize(title), _normalize(description), _normalize(target_audience)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PersonaCache:
+    """
+    Personas generated per product context, stored in Mongo (PERSONA_CACHE_COLLECTION
+    in the request's database) with an in-process LRU of recently used contexts
+    in front of it. Entries hold only the persona content (CACHED_FIELDS); reused
+    personas get a fresh id when they are written for a new request. Each context
+    keeps its newest `max_per_key` personas, in Mongo as well as in process.
+    """
+
+    def __init__(self, max_keys: int = PERSONA_CACHE_MAX_KEYS, max_per_key: int = PERSONA_CACHE_MAX_PER_KEY,
+                 ttl_s: int = PERSONA_CACHE_TTL_S):
+        self.max_keys = max_keys
+        self.max_per_key = max_per_key
+        self.ttl_s = ttl_s
+        self._lru: "OrderedDict[Tuple[str, str], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._indexed: Set[str] = set()
+
+    def _remember(self, lru_key: Tuple[str, str], personas: List[Dict[str, Any]]) -> None:
+        self._lru[lru_key] = (time.monotonic(), personas[: self.max_per_key])
+        self._lru.move_to_end(lru_key)
+        while len(self._lru) > self.max_keys:
+            self._lru.popitem(last=False)
+
+    async def _ensure_index(self, mongo: AsyncMongoDBClient) -> None:
+        if mongo.db_name in self._indexed:
+            return
+        # serves both the newest-first reads and the trim after each add
+        await mongo.get_collection(PERSONA_CACHE_COLLECTION).create_index([("context_key", 1), ("_id", -1)])
+        self._indexed.add(mongo.db_name)
+
+    async def get(self, mongo: AsyncMongoDBClient, key: str, limit: int) -> List[Dict[str, Any]]:
+        """Up to `limit` cached personas for the context `key`."""
+        if limit <= 0:
+            return []
+        lru_key = (mongo.db_name, key)
+        hit = self._lru.get(lru_key)
+        if hit is not None and time.monotonic() - hit[0] < self.ttl_s:
+            self._lru.move_to_end(lru_key)
+            return [dict(p) for p in hit[1][:limit]]
+
+        projection = {field: 1 for field in CACHED_FIELDS}
+        projection["_id"] = 0
+        cursor = (
+            mongo.get_collection(PERSONA_CACHE_COLLECTION)
+            .find({"context_key": key}, projection)
+            .sort("_id", -1)
+            .limit(self.max_per_key)
+        )
+        personas = await cursor.to_list(None)
+        self._remember(lru_key, personas)
+        return [dict(p) for p in personas[:limit]]
+
+    async def add(self, mongo: AsyncMongoDBClient, key: str, personas: List[Dict[str, Any]]) -> None:
+        """Stores newly generated personas under the context `key`."""
+        entries = [{field: p.get(field) for field in CACHED_FIELDS} for p in personas]
+        if not entries:
+            return
+        await self._ensure_index(mongo)
+        await mongo.insert_many(PERSONA_CACHE_COLLECTION, [{**e, "context_key": key} for e in entries])
+        await self._trim(mongo, key)
+        lru_key = (mongo.db_name, key)
+        hit = self._lru.get(lru_key)
+        if hit is not None:
+            self._remember(lru_key, entries[::-1] + hit[1])
+
+    async def _trim(self, mongo: AsyncMongoDBClient, key: str) -> None:
+        """Deletes all but the newest `max_per_key` personas stored for `key`."""
+        collection = mongo.get_collection(PERSONA_CACHE_COLLECTION)
+        cursor = collection.find({"context_key": key}, {"_id": 1}).sort("_id", -1).skip(self.max_per_key).limit(1)
+        newest_dropped = await cursor.to_list(1)
+        if newest_dropped:
+            await collection.delete_many({"context_key": key, "_id": {"$lte": newest_dropped[0]["_id"]}})
+
+
+_cache: Optional[PersonaCache] = None
+
+
+def get_persona_cache() -> PersonaCache:
+    global _cache
+    if _cache is None:
+        _cache = PersonaCache()
+    return _cache
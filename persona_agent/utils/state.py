@@ -13,11 +13,18 @@ class AgentState(TypedDict, total=False):
     number: int                         # Total personas to generate
     collection_name: str                # MongoDB collection for personas
     DB_name: str                        # MongoDB database override (optional)
+    concurrency: int                    # AIML calls in flight at once; > 1 enables concurrent mode
+    batch_size: int                     # Personas requested per AIML call; > 1 enables concurrent mode
+    state_mode: str                     # "full" (default) | "refs": keep only the latest persona's ids in state
+    fresh: bool                         # Skip the persona cache and generate every persona
 
     # Accumulators / outputs
-    persona: List[Dict]                 # Collected personas
+    persona: List[Dict]                 # Collected personas (left empty in refs mode; read them from Mongo)
     current_persona: Optional[Dict]     # Persona produced in current iteration
-    generated_count: int                # Personas generated so far
+    generated_count: int                # Personas stored so far (generated + reused)
+    reused_count: int                   # Of those, taken from the persona cache
+    dedup_retries: int                  # Consecutive near-duplicate rejections of the current persona
+    dedup_rejected: int                 # Near-duplicate personas rejected in this thread
 
     # Metadata
     status: str                         # "pending" | "completed" (optional)
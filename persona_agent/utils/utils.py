@@ -1,11 +1,60 @@
 import os
-from typing import Any, Dict
-from pymongo import MongoClient
+import asyncio
+import weakref
+from typing import Any, Dict, List, Optional
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.collection import Collection
 
+# Pool settings shared by every client the registry opens.
+MONGO_POOL_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "20")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000")),
+    "retryWrites": True,
+}
+
+# Process-wide registry: one pooled pymongo client per URI. Async clients are bound
+# to the event loop that first used them, so those are kept per loop, then per URI.
+_sync_clients: Dict[str, MongoClient] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncMongoClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def shared_mongo_client(uri: str) -> MongoClient:
+    client = _sync_clients.get(uri)
+    if client is None:
+        client = MongoClient(uri, **MONGO_POOL_OPTIONS)
+        _sync_clients[uri] = client
+    return client
+
+
+def shared_async_mongo_client(uri: str) -> AsyncMongoClient:
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(uri)
+    if client is None:
+        client = AsyncMongoClient(uri, **MONGO_POOL_OPTIONS)
+        clients[uri] = client
+    return client
+
+
+async def close_mongo_clients() -> None:
+    """Closes every registered client; call once on shutdown."""
+    for client in _sync_clients.values():
+        client.close()
+    _sync_clients.clear()
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+
+
 class MongoDBClient:
     """
     A simple MongoDB client wrapper to handle connection, read, and write operations.
+    The underlying pymongo client is shared per URI (see shared_mongo_client).
     """
 
     def __init__(self, uri: str = None, db_name: str = None):
@@ -17,7 +66,7 @@ class MongoDBClient:
         if not self.db_name:
             raise ValueError("MongoDB DB name is missing. Set MONGODB_DB_NAME environment variable.")
 
-        self.client = MongoClient(self.uri)
+        self.client = shared_mongo_client(self.uri)
         self.db = self.client[self.db_name]
 
 
@@ -29,6 +78,11 @@ class MongoDBClient:
         col = self.get_collection(collection)
         return col.insert_one(document)
 
+
+    def insert_many(self, collection: str, documents: List[Dict[str, Any]]) -> Any:
+        col = self.get_collection(collection)
+        return col.insert_many(documents)
+
     
     def find(self, collection: str, query: Dict[str, Any] = None) -> Any:
         col = self.get_collection(collection)
@@ -58,6 +112,65 @@ def get_mongo_client() -> MongoDBClient:
         _mongo_instance = MongoDBClient()
     return _mongo_instance
 
+
+class AsyncMongoDBClient:
+    """
+    Async counterpart of MongoDBClient on pymongo's native asyncio driver.
+    Same collection-per-call API; every I/O method is awaited on the event loop.
+    Cheap to construct: the connection pool comes from the per-URI registry.
+    """
+
+    def __init__(self, uri: str = None, db_name: str = None):
+        self.uri = uri or os.getenv("MONGODB_URI")
+        self.db_name = db_name or os.getenv("MONGODB_DB_NAME")
+
+        if not self.uri:
+            raise ValueError("MongoDB URI is missing. Set MONGODB_URI environment variable.")
+        if not self.db_name:
+            raise ValueError("MongoDB DB name is missing. Set MONGODB_DB_NAME environment variable.")
+
+        self.client = shared_async_mongo_client(self.uri)
+        self.db = self.client[self.db_name]
+
+
+    def get_collection(self, name: str) -> AsyncCollection:
+        return self.db[name]
+
+
+    async def insert_one(self, collection: str, document: Dict[str, Any]) -> Any:
+        col = self.get_collection(collection)
+        return await col.insert_one(document)
+
+
+    async def insert_many(self, collection: str, documents: List[Dict[str, Any]]) -> Any:
+        col = self.get_collection(collection)
+        return await col.insert_many(documents)
+
+
+    async def find(self, collection: str, query: Dict[str, Any] = None) -> Any:
+        col = self.get_collection(collection)
+        return await col.find(query or {}).to_list(None)
+
+
+    async def find_one(self, collection: str, query: Dict[str, Any] = None) -> Any:
+        col = self.get_collection(collection)
+        return await col.find_one(query or {})
+
+
+    async def update_one(self, collection: str, query: Dict[str, Any], update: Dict[str, Any]) -> Any:
+        col = self.get_collection(collection)
+        return await col.update_one(query, update)
+
+    async def delete_one(self, collection: str, query: Dict[str, Any]) -> Any:
+        col = self.get_collection(collection)
+        return await col.delete_one(query)
+
+
+def get_async_mongo_client(db_name: Optional[str] = None, uri: Optional[str] = None) -> AsyncMongoDBClient:
+    """AsyncMongoDBClient for `db_name` (default MONGODB_DB_NAME) over the shared pool for `uri`."""
+    return AsyncMongoDBClient(uri=uri, db_name=db_name)
+
+
 from google import genai
 # fmt: off
 PROJECT_ID = "gen-lang-client-0863855409"  # @param {type: "string", placeholder: "[your-project-id]", isTemplate: true}
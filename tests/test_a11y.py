@@ -0,0 +1,58 @@
+from my_agent.utils.a11y import A11yEncoder
+
+
+def _tree(*children):
+    return {"role": "WebArea", "name": "Page", "children": list(children)}
+
+
+def _ids_by_line(encoder, tree):
+    """encoder id -> its listing line, from a full encode."""
+    text = encoder.encode(tree, allow_diff=False)
+    return {line.split(" ", 1)[0]: line for line in text.splitlines()[1:]}
+
+
+def test_selector_numbers_named_and_unnamed_nodes_separately():
+    encoder = A11yEncoder()
+    tree = _tree(
+        {"role": "button", "name": "Save"},
+        {"role": "button"},
+        {"role": "button", "name": "Save"},
+        {"role": "button", "name": ""},
+    )
+    lines = _ids_by_line(encoder, tree)
+    assert list(lines) == ["e1", "e2", "e3", "e4"]
+
+    assert encoder.selector("e1") == 'role=button[name="Save"s] >> nth=0'
+    assert encoder.selector("e2") == 'role=button[name=""s] >> nth=0'
+    assert encoder.selector("e3") == 'role=button[name="Save"s] >> nth=1'
+    assert encoder.selector("e4") == 'role=button[name=""s] >> nth=1'
+
+
+def test_selector_escapes_quotes_in_names():
+    encoder = A11yEncoder()
+    encoder.encode(_tree({"role": "link", "name": 'Say "hi"'}))
+    assert encoder.selector("e1") == 'role=link[name="Say \\"hi\\""s] >> nth=0'
+
+
+def test_selector_rejects_unknown_refs():
+    encoder = A11yEncoder()
+    encoder.encode(_tree({"role": "button", "name": "Go"}))
+    assert encoder.selector("e9") is None
+    assert encoder.selector("button") is None
+    assert encoder.selector("") is None
+
+
+def test_ids_stay_stable_and_encode_diffs():
+    encoder = A11yEncoder()
+    nodes = [{"role": "textbox", "name": f"Field {i}"} for i in range(5)]
+    encoder.encode(_tree(*nodes))
+
+    changed = [dict(n) for n in nodes[:4]] + [{"role": "button", "name": "Submit"}]
+    changed[0]["value"] = "ada"
+    text = encoder.encode(_tree(*changed))
+
+    assert not encoder.last_was_full
+    assert "+ e6 button \"Submit\"" in text
+    assert "- e5" in text
+    assert "~ e1 textbox \"Field 0\" value=ada" in text
+    assert encoder.selector("e6") == 'role=button[name="Submit"s] >> nth=0'
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import pytest
+
+from my_agent.utils.cassette import Cassette, CassetteMiss
+from my_agent.utils.page_hash import PageFingerprint
+
+URL = "http://localhost:8000/index.html"
+INSTRUCTION = "Explore as Ada, a 34-year-old nurse."
+
+
+def _fp(phash, a11y="a11y-1"):
+    return PageFingerprint(phash=phash, image_sha1=f"sha-{phash}", a11y=a11y)
+
+
+def _open(directory, mode, instruction=INSTRUCTION):
+    return asyncio.run(Cassette.open(str(directory), mode, URL, instruction))
+
+
+def _record(directory, steps):
+    cassette = _open(directory, "record")
+    for step, (fp, response) in enumerate(steps, 1):
+        cassette.record(cassette.next_key(fp), step, fp, response)
+    asyncio.run(cassette.save())
+    return cassette
+
+
+def test_keys_are_deterministic_and_chained(tmp_path):
+    a, b = _open(tmp_path, "record"), _open(tmp_path, "record")
+    assert [a.next_key(_fp(1)), a.next_key(_fp(2))] == [b.next_key(_fp(1)), b.next_key(_fp(2))]
+
+    # the same page reached through a different history gets a different key
+    c = _open(tmp_path, "record")
+    c.next_key(_fp(3))
+    assert c.next_key(_fp(2)) != b.next_key(_fp(2))
+
+
+def test_keys_depend_on_instruction_and_a11y(tmp_path):
+    base = _open(tmp_path, "record").next_key(_fp(1))
+    assert _open(tmp_path, "record", "Explore as Bo.").next_key(_fp(1)) != base
+    assert _open(tmp_path, "record").next_key(_fp(1, a11y="a11y-2")) != base
+
+
+def test_keys_fall_back_to_the_exact_hash_without_a_phash(tmp_path):
+    a = _open(tmp_path, "record").next_key(PageFingerprint(None, "sha-x", "t"))
+    b = _open(tmp_path, "record").next_key(PageFingerprint(None, "sha-y", "t"))
+    assert a != b
+
+
+def test_replay_serves_recorded_steps_in_order(tmp_path):
+    steps = [(_fp(1), '{"actions": [{"action": "click"}]}'), (_fp(2), '{"overall_rating": 4}')]
+    recorded = _record(tmp_path, steps)
+
+    with open(recorded.path, encoding="utf-8") as fh:
+        rows = [json.loads(line) for line in fh]
+    assert [r["step"] for r in rows] == [1, 2]
+    assert rows[0]["actions"] == [{"action": "click"}]
+
+    replay = _open(tmp_path, "replay")
+    assert [replay.lookup(replay.next_key(fp)) for fp, _ in steps] == [r for _, r in steps]
+
+
+def test_replay_miss_raises_and_auto_falls_through(tmp_path):
+    _record(tmp_path, [(_fp(1), "{}")])
+
+    replay = _open(tmp_path, "replay")
+    with pytest.raises(CassetteMiss):
+        replay.lookup(replay.next_key(_fp(9)))
+
+    auto = _open(tmp_path, "auto")
+    assert auto.lookup(auto.next_key(_fp(9))) is None
+
+
+def test_record_mode_never_serves_old_responses(tmp_path):
+    _record(tmp_path, [(_fp(1), "{}")])
+    cassette = _open(tmp_path, "record")
+    assert cassette.lookup(cassette.next_key(_fp(1))) is None
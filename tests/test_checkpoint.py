@@ -0,0 +1,64 @@
+import operator
+from typing import Annotated, List, TypedDict
+
+from langgraph.graph import END, START, StateGraph
+
+from persona_agent.utils import checkpoint
+from persona_agent.utils.checkpoint import BoundedMemorySaver, ThreadEviction
+
+
+class _State(TypedDict, total=False):
+    steps: Annotated[List[str], operator.add]
+
+
+def _graph(saver):
+    builder = StateGraph(_State)
+    builder.add_node("a", lambda s: {"steps": ["a"]})
+    builder.add_node("b", lambda s: {"steps": ["b"]})
+    builder.add_edge(START, "a")
+    builder.add_edge("a", "b")
+    builder.add_edge("b", END)
+    return builder.compile(checkpointer=saver)
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_only_the_latest_checkpoint_and_its_blobs_are_kept():
+    saver = BoundedMemorySaver()
+    graph = _graph(saver)
+    graph.invoke({"steps": []}, _config("t1"))
+    graph.invoke({"steps": []}, _config("t1"))
+
+    assert len(list(saver.list(_config("t1")))) == 1
+    assert graph.get_state(_config("t1")).values == {"steps": ["a", "b", "a", "b"]}
+    # one blob per channel version still referenced by that checkpoint
+    latest = saver.get_tuple(_config("t1")).checkpoint["channel_versions"]
+    assert {(k[2], k[3]) for k in saver.blobs if k[0] == "t1"} <= set(latest.items())
+
+
+def test_least_recently_used_threads_are_evicted():
+    saver = BoundedMemorySaver(max_threads=2)
+    graph = _graph(saver)
+    for thread_id in ("t1", "t2", "t1", "t3"):
+        graph.invoke({"steps": []}, _config(thread_id))
+
+    assert saver.get_tuple(_config("t2")) is None
+    assert saver.get_tuple(_config("t1")) is not None
+    assert saver.get_tuple(_config("t3")) is not None
+
+
+def test_idle_threads_expire_but_the_writer_is_kept(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(checkpoint.time, "time", lambda: clock[0])
+    eviction = ThreadEviction(max_threads=10, ttl_s=60)
+    eviction.touch("old")
+    clock[0] += 30
+    eviction.touch("recent")
+    clock[0] += 45
+
+    assert eviction.expired(keep="recent") == ["old"]
+    assert eviction.expired(keep="recent") == []
+    clock[0] += 3600
+    assert eviction.expired(keep="recent") == []
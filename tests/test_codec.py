@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+import ormsgpack
+import pytest
+from langgraph.types import Send
+
+from my_agent.utils.codec import RecordSerializer, pack, unpack
+from my_agent.utils.schema import Feedback, Persona
+
+PERSONA = Persona(id="p1", name="Ada", age=34, gender="female", occupation="Nurse", bio="Night shifts.")
+FEEDBACK = Feedback(
+    id="f1",
+    job="job-1",
+    persona="p1",
+    feedback='{"overall_rating": 4}',
+    rating=4.0,
+    rubric_breakdown={"clarity": 5},
+    raw_actions={"totals": {"timings_ms": {"model": 812.5}}, "steps": [{"step": 1}]},
+    created_at="2025-01-01T00:00:00Z",
+)
+
+
+def test_records_round_trip_inside_plain_containers():
+    state = {"personas": [PERSONA, Persona(id=None, name="Bo")], "current_feedback": FEEDBACK, "index": 1}
+    assert unpack(pack(state)) == state
+
+
+def test_records_pack_as_rows_without_field_names():
+    data = pack(PERSONA)
+    assert b"occupation" not in data
+    assert len(data) < len(ormsgpack.packb(PERSONA.to_dict()))
+
+
+def test_pack_refuses_values_it_cannot_represent_exactly():
+    for value in [(1, 2), datetime(2025, 1, 1, tzinfo=timezone.utc), Send("evaluate_persona", {})]:
+        with pytest.raises(TypeError):
+            pack({"value": value})
+
+
+def test_unknown_ext_code_is_rejected():
+    with pytest.raises(ValueError):
+        unpack(ormsgpack.packb(ormsgpack.Ext(99, b"")))
+
+
+def test_serializer_uses_records_when_it_can_and_jsonplus_otherwise():
+    serde = RecordSerializer()
+
+    typed = serde.dumps_typed({"personas": [PERSONA]})
+    assert typed[0] == RecordSerializer.TYPE
+    assert serde.loads_typed(typed) == {"personas": [PERSONA]}
+
+    value = {"send": Send("evaluate_persona", {"persona": "p1"}), "at": datetime(2025, 1, 1, tzinfo=timezone.utc)}
+    typed = serde.dumps_typed(value)
+    assert typed[0] != RecordSerializer.TYPE
+    assert serde.loads_typed(typed) == value
@@ -0,0 +1,64 @@
+from persona_agent.utils import dedup
+from persona_agent.utils.dedup import DedupIndex, minhash, similarity, shingles
+
+NURSE = {
+    "name": "Ada",
+    "occupation": "Night-shift nurse",
+    "bio": "Works twelve hour shifts at a city hospital and orders groceries online between shifts.",
+}
+NURSE_RENAMED = {**NURSE, "name": "Beatrice"}
+NURSE_REWORDED = {
+    **NURSE,
+    "bio": "Works twelve hour shifts at a city hospital and orders her groceries online between shifts.",
+}
+FARMER = {
+    "name": "Carl",
+    "occupation": "Dairy farmer",
+    "bio": "Runs a family farm with sixty cows and buys feed in bulk from the local cooperative.",
+}
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("Hello, World!  again") == shingles("hello world again")
+    assert shingles("") == set()
+
+
+def test_minhash_is_deterministic_and_estimates_jaccard():
+    text = dedup.persona_text(NURSE)
+    assert minhash(text) == minhash(text)
+    assert similarity(minhash(text), minhash(text)) == 1.0
+    assert similarity(minhash(text), minhash(dedup.persona_text(FARMER))) < 0.2
+
+
+def test_admit_rejects_near_duplicates_but_not_new_profiles():
+    index = DedupIndex()
+    assert index.admit(NURSE)
+    assert not index.admit(NURSE_RENAMED)      # names are not compared
+    assert not index.admit(NURSE_REWORDED)
+    assert index.admit(FARMER)
+    assert len(index) == 2
+
+
+def test_duplicate_score_does_not_add():
+    index = DedupIndex()
+    index.add(NURSE)
+    assert index.duplicate_score(NURSE_REWORDED) >= index.threshold
+    assert index.duplicate_score(FARMER) is None
+    assert len(index) == 1
+
+
+def test_indexes_are_seeded_once_per_thread_and_bounded(monkeypatch):
+    monkeypatch.setattr(dedup, "_indexes", type(dedup._indexes)())
+    monkeypatch.setattr(dedup, "DEDUP_MAX_THREADS", 2)
+
+    first = dedup.get_dedup_index("t1", seed=[NURSE])
+    assert dedup.get_dedup_index("t1", seed=[FARMER]) is first
+    assert len(first) == 1
+
+    dedup.get_dedup_index("t2")
+    dedup.get_dedup_index("t1")                 # t1 is now the most recently used
+    dedup.get_dedup_index("t3")
+    assert list(dedup._indexes) == ["t1", "t3"]
+
+    dedup.drop_dedup_index("t1")
+    assert list(dedup._indexes) == ["t3"]
@@ -0,0 +1,61 @@
+import struct
+import zlib
+
+from my_agent.utils.page_hash import PageFingerprint, a11y_hash, decode_png_gray, dhash, image_hash
+
+
+def _png(width, height, pixel, alpha=False):
+    """Minimal 8-bit RGB(A) PNG; `pixel(x, y)` returns a gray level used for every channel."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    channels = 4 if alpha else 3
+    raw = b"".join(
+        b"\x00" + bytes(v for x in range(width) for v in [pixel(x, y)] * 3 + ([255] if alpha else []))
+        for y in range(height)
+    )
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6 if alpha else 2, 0, 0, 0)
+    assert len(raw) == height * (1 + width * channels)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+def _gradient(x, y):
+    return min(255, x * 8)
+
+
+def test_decode_png_gray_reads_rgb_and_rgba():
+    for alpha in (False, True):
+        width, height, gray = decode_png_gray(_png(4, 2, lambda x, y: 10 * x + y, alpha))
+        assert (width, height) == (4, 2)
+        assert gray == [0, 10, 20, 30, 1, 11, 21, 31]
+
+
+def test_dhash_encodes_horizontal_gradients():
+    width, height = 18, 8
+    rising = [_gradient(x, y) for y in range(height) for x in range(width)]
+    falling = [255 - v for v in rising]
+    assert dhash(width, height, rising) == (1 << 64) - 1
+    assert dhash(width, height, falling) == 0
+
+
+def test_image_hash_tolerates_small_changes():
+    base = _png(36, 16, _gradient)
+    speck = _png(36, 16, lambda x, y: 255 if (x, y) == (3, 3) else _gradient(x, y))
+    (phash_a, sha_a), (phash_b, sha_b) = image_hash(base), image_hash(speck)
+    assert sha_a != sha_b
+    assert bin(phash_a ^ phash_b).count("1") <= 4
+
+
+def test_image_hash_falls_back_to_sha_for_unsupported_images():
+    phash, sha = image_hash(b"\xff\xd8not a png")
+    assert phash is None and len(sha) == 40
+
+
+def test_fingerprint_matches():
+    tree = {"role": "WebArea", "children": [{"role": "button", "name": "Go"}]}
+    a = PageFingerprint(0b1111, "sha-a", a11y_hash(tree))
+    assert a.matches(PageFingerprint(0b0111, "sha-b", a11y_hash(tree)), max_distance=1)
+    assert not a.matches(PageFingerprint(0b0001, "sha-b", a11y_hash(tree)), max_distance=1)
+    assert not a.matches(PageFingerprint(0b1111, "sha-a", a11y_hash({"role": "WebArea"})), max_distance=4)
+    assert not a.matches(None, max_distance=4)
+    assert PageFingerprint(None, "sha-a", "t").matches(PageFingerprint(5, "sha-a", "t"), max_distance=0)
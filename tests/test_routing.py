@@ -0,0 +1,34 @@
+from my_agent.utils.routing import RequestRouter, RoutingProfile
+
+SITE = "https://shop.example.com/index.html"
+
+
+def test_default_profile_blocks_trackers_and_third_party_media():
+    router = RequestRouter(RoutingProfile.named("default"), SITE)
+    assert router.classify("https://www.google-analytics.com/g/collect", "xhr") == "tracker"
+    assert router.classify("https://region1.google-analytics.com/g/collect", "fetch") == "tracker"
+    assert router.classify("https://www.facebook.com/tr?id=1", "image") == "tracker"
+    assert router.classify("https://videos.cdn.net/intro.mp4", "media") == "media"
+    assert router.classify("https://static.example.com/intro.mp4", "media") is None
+    assert router.classify("https://static.example.com/app.js", "script") is None
+    assert router.classify("https://fonts.gstatic.com/a.woff2", "font") is None
+
+
+def test_tracker_suffixes_do_not_match_lookalike_hosts():
+    router = RequestRouter(RoutingProfile.named("default"), SITE)
+    assert router.classify("https://notclarity.ms/x.js", "script") is None
+
+
+def test_strict_profile_blocks_all_media_and_stubs_fonts():
+    router = RequestRouter(RoutingProfile.named("strict"), SITE)
+    assert router.classify("https://static.example.com/intro.mp4", "media") == "media"
+    assert router.classify("https://fonts.gstatic.com/a.woff2", "font") == "font"
+
+
+def test_off_profile_only_applies_extra_patterns():
+    assert not RoutingProfile.named("off").enabled
+    router = RequestRouter(RoutingProfile.named("off", ["ads.example.net", "*://*/beacon/*"]), SITE)
+    assert router.profile.enabled
+    assert router.classify("https://ads.example.net/pixel.gif", "image") == "tracker"
+    assert router.classify("https://shop.example.com/beacon/hit", "xhr") == "tracker"
+    assert router.classify("https://www.google-analytics.com/g/collect", "xhr") is None